@@ -1,14 +1,41 @@
 """
 Generate System Workflow Schematic Diagram
+
+The diagram is a static asset: run this script after changing it and commit
+the resulting PNG. Runs are skipped when the PNG was already rendered from
+the current version of this file (pass --force to regenerate anyway).
 """
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
-import numpy as np
+import argparse
+import hashlib
+import math
+import os
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'docs')
+DIAGRAM_PATH = os.path.join(DOCS_DIR, 'system_workflow_diagram.png')
+HASH_PATH = os.path.join(DOCS_DIR, 'system_workflow_diagram.hash')
+
 
+def source_hash() -> str:
+    """Hash of this script, used to detect when the diagram needs re-rendering"""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def diagram_is_current() -> bool:
+    """Check whether the saved PNG was rendered from the current source"""
+    if not (os.path.exists(DIAGRAM_PATH) and os.path.exists(HASH_PATH)):
+        return False
+    
+    with open(HASH_PATH) as f:
+        return f.read().strip() == source_hash()
 
-def create_workflow_diagram():
+
+def create_workflow_diagram(output_path: str = DIAGRAM_PATH):
     """Create a comprehensive workflow diagram for the Smart Fridge AI System"""
+    # Imported here so up-to-date runs never pay for loading Matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import FancyBboxPatch
+    from matplotlib.collections import LineCollection, PatchCollection
     
     fig, ax = plt.subplots(figsize=(16, 12))
     ax.set_xlim(0, 10)
@@ -28,26 +55,26 @@ def create_workflow_diagram():
         'alert': '#FFEBEE'       # Light Red
     }
     
+    # Boxes are collected here and added to the axes in a single collection
+    boxes = []
+    
     # Define box style
     def draw_box(x, y, width, height, text, color, fontsize=10):
-        box = FancyBboxPatch((x, y), width, height,
-                            boxstyle="round,pad=0.1",
-                            edgecolor='black',
-                            facecolor=color,
-                            linewidth=2)
-        ax.add_patch(box)
+        boxes.append(FancyBboxPatch((x, y), width, height,
+                                    boxstyle="round,pad=0.1",
+                                    edgecolor='black',
+                                    facecolor=color,
+                                    linewidth=2))
         ax.text(x + width/2, y + height/2, text,
                fontsize=fontsize, ha='center', va='center',
                weight='bold', wrap=True)
     
     # Define arrow style
+    # Arrows are collected here and drawn as one line collection at the end
+    arrows = []  # ((x1, y1), (x2, y2), head_at_start, head_at_end)
+    
     def draw_arrow(x1, y1, x2, y2, label='', style='->'):
-        arrow = FancyArrowPatch((x1, y1), (x2, y2),
-                               arrowstyle=style,
-                               color='black',
-                               linewidth=2,
-                               mutation_scale=20)
-        ax.add_patch(arrow)
+        arrows.append(((x1, y1), (x2, y2), style.startswith('<'), style.endswith('>')))
         if label:
             mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
             ax.text(mid_x + 0.2, mid_y + 0.1, label,
@@ -150,14 +177,15 @@ def create_workflow_diagram():
     
     for i, (color, label) in enumerate(legend_items):
         x_pos = 0.5 + (i * 1.8)
-        legend_box = FancyBboxPatch((x_pos, legend_y), 0.3, 0.3,
-                                   boxstyle="round,pad=0.05",
-                                   edgecolor='black',
-                                   facecolor=color,
-                                   linewidth=1)
-        ax.add_patch(legend_box)
+        boxes.append(FancyBboxPatch((x_pos, legend_y), 0.3, 0.3,
+                                    boxstyle="round,pad=0.05",
+                                    edgecolor='black',
+                                    facecolor=color,
+                                    linewidth=1))
         ax.text(x_pos + 0.4, legend_y + 0.15, label, fontsize=7, va='center')
     
+    ax.add_collection(PatchCollection(boxes, match_original=True))
+    
     # Add system features box
     features_text = """Key System Features:
     • Automated Food Detection using Computer Vision
@@ -174,15 +202,57 @@ def create_workflow_diagram():
            verticalalignment='top', family='monospace')
     
     plt.tight_layout()
-    plt.savefig('/home/claude/smart_fridge_ai/docs/system_workflow_diagram.png',
-                dpi=300, bbox_inches='tight', facecolor='white')
-    print("Workflow diagram saved to: docs/system_workflow_diagram.png")
+    
+    # Shape the arrows in inches, relative to their start point, now that the
+    # axes are final: the open heads keep the size and angle of
+    # FancyArrowPatch's '->' at any dpi and through the tight bbox crop
+    to_inches = ax.transData + fig.dpi_scale_trans.inverted()
+    shrink = 2 / 72  # FancyArrowPatch's default shrinkA/shrinkB of 2 points
+    head_length, head_width = 8 / 72, 4 / 72  # '->' with mutation_scale=20
+    lines = []
+    anchors = []
+    for start, end, head_at_start, head_at_end in arrows:
+        (x1, y1), (x2, y2) = to_inches.transform([start, end])
+        length = math.hypot(x2 - x1, y2 - y1)
+        ux, uy = (x2 - x1) / length, (y2 - y1) / length
+        tips = ((ux * shrink, uy * shrink, -ux, -uy, head_at_start),
+                (ux * (length - shrink), uy * (length - shrink), ux, uy, head_at_end))
+        lines.append([tip[:2] for tip in tips])
+        anchors.append(start)
+        for tx, ty, dx, dy, has_head in tips:
+            if has_head:
+                bx, by = tx - dx * head_length, ty - dy * head_length
+                lines.append(((bx - dy * head_width, by + dx * head_width), (tx, ty),
+                              (bx + dy * head_width, by - dx * head_width)))
+                anchors.append(start)
+    
+    # Above the boxes (zorder 1) as the per-arrow patches were, below the labels (zorder 3)
+    ax.add_collection(LineCollection(lines, offsets=anchors, offset_transform=ax.transData,
+                                     transform=fig.dpi_scale_trans, colors='black',
+                                     linewidths=2, capstyle='butt', joinstyle='round',
+                                     zorder=2), autolim=False)
+    
+    # 150 dpi is plenty for a schematic; let Pillow squeeze the PNG as well
+    plt.savefig(output_path, dpi=150, bbox_inches='tight', facecolor='white',
+                pil_kwargs={'optimize': True, 'compress_level': 9})
+    print(f"Workflow diagram saved to: {output_path}")
+    
+    if output_path == DIAGRAM_PATH:
+        with open(HASH_PATH, 'w') as f:
+            f.write(source_hash())
     
     return fig
 
 
 if __name__ == "__main__":
-    import os
-    os.makedirs('/home/claude/smart_fridge_ai/docs', exist_ok=True)
-    create_workflow_diagram()
-    print("Workflow schematic generated successfully!")
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerate the diagram even if it is up to date')
+    args = parser.parse_args()
+    
+    if not args.force and diagram_is_current():
+        print("Workflow diagram is up to date, skipping.")
+    else:
+        os.makedirs(DOCS_DIR, exist_ok=True)
+        create_workflow_diagram()
+        print("Workflow schematic generated successfully!")
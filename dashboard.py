@@ -2,11 +2,13 @@
 Smart Fridge AI Dashboard - Interactive Web Interface
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import json
 import sys
+import time
+from typing import TYPE_CHECKING
 import os
 
 # Add parent directory to path
@@ -15,9 +17,11 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.database import FridgeDatabase
 from src.expiry_tracker import ExpiryTracker, AlertManager
 from src.recipe_generator import RecipeGenerator
-from src.food_detector import FoodDetector
 import src.config as config
 
+if TYPE_CHECKING:
+    from src.food_detector import FoodDetector
+
 
 # Page configuration
 st.set_page_config(
@@ -65,24 +69,122 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Pre-rendered workflow diagram (see create_workflow_diagram.py)
+WORKFLOW_DIAGRAM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     'docs', 'system_workflow_diagram.png')
+
+# Inventory status message templates, keyed by _classify_days output
+STATUS_MESSAGES = {
+    'expired': '🔴 Expired {d} day(s) ago',
+    'critical': '🔴 Expires in {d} day(s)',
+    'warning': '🟠 Expires in {d} days',
+    'fresh': '🔵 Expires in {d} days',
+    'unknown': '⚪ No expiry date'
+}
+
+# Chart colors per expiry status
+STATUS_COLORS = {
+    'Critical': '#f44336',
+    'Warning': '#ff9800',
+    'Normal': '#2196f3',
+    'Fresh': '#4caf50'
+}
+
+
 # Initialize components
 @st.cache_resource
 def initialize_system():
-    """Initialize all system components"""
+    """Initialize the database-backed system components"""
     db = FridgeDatabase()
     tracker = ExpiryTracker(db)
     alert_manager = AlertManager(db)
     recipe_gen = RecipeGenerator()
-    food_detector = FoodDetector()
     
-    return db, tracker, alert_manager, recipe_gen, food_detector
+    return db, tracker, alert_manager, recipe_gen
+
+
+@st.cache_resource
+def _get_detector():
+    """Shared food detector; its models load on the first scan"""
+    # Imported here so only sessions that open Scan Items load OpenCV & co.
+    from src.food_detector import FoodDetector
+    
+    return FoodDetector()
+
+
+@st.cache_resource
+def _get_scan_executor():
+    """Single background worker that runs image scans off the script thread"""
+    return ThreadPoolExecutor(max_workers=1)
+
+
+# Cached queries (leading underscore tells Streamlit not to hash the argument)
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_stats(_db: FridgeDatabase):
+    """Summary statistics, cached between reruns"""
+    return _db.get_statistics()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_expiry(_tracker: ExpiryTracker):
+    """Expiry status groups, cached between reruns"""
+    return _tracker.check_expiry_status()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_recent_items(_db: FridgeDatabase):
+    """Most recently added items, cached between reruns"""
+    return _db.get_recent_items(limit=5)
+
+
+@st.cache_data(show_spinner=False)
+def _workflow_png(path: str, mtime: float) -> bytes:
+    """Workflow diagram bytes; mtime is part of the key so a regenerated PNG is picked up"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _invalidate_caches():
+    """Drop cached query results after the database has been modified"""
+    _cached_stats.clear()
+    _cached_expiry.clear()
+    _cached_recent_items.clear()
+
+
+def _top_categories(category_df: pd.DataFrame, max_categories: int) -> pd.DataFrame:
+    """Keep the largest categories and group the rest into an "Other" slice"""
+    if len(category_df) <= max_categories:
+        return category_df
+    
+    top = category_df.nlargest(max_categories - 1, 'Count')
+    other_count = category_df['Count'].sum() - top['Count'].sum()
+    other = pd.DataFrame([{'Category': 'Other', 'Count': other_count}])
+    return pd.concat([top, other], ignore_index=True)
+
+
+def _classify_days(days_left: np.ndarray) -> np.ndarray:
+    """Classify days until expiry into STATUS_MESSAGES keys in one vectorized pass"""
+    return np.select(
+        [np.isnan(days_left),
+         days_left < 0,
+         days_left <= config.ALERT_THRESHOLDS['critical'],
+         days_left <= config.ALERT_THRESHOLDS['warning']],
+        ['unknown', 'expired', 'critical', 'warning'],
+        default='fresh'
+    )
+
+
+def _status_messages(days_left: np.ndarray) -> list:
+    """Fill the per-status message template for every item"""
+    return [STATUS_MESSAGES[status].format(d=0 if np.isnan(d) else abs(int(d)))
+            for status, d in zip(_classify_days(days_left), days_left)]
 
 
 def main():
     """Main dashboard function"""
     
     # Initialize system
-    db, tracker, alert_manager, recipe_gen, food_detector = initialize_system()
+    db, tracker, alert_manager, recipe_gen = initialize_system()
     
     # Header
     st.markdown('<h1 class="main-header">🧊 Smart Fridge AI System</h1>', unsafe_allow_html=True)
@@ -105,7 +207,7 @@ def main():
     
     # Scan Items Page
     elif page == "Scan Items":
-        show_scan_page(db, food_detector)
+        show_scan_page(db, _get_detector())
     
     # Alerts Page
     elif page == "Alerts":
@@ -126,8 +228,8 @@ def show_dashboard(db: FridgeDatabase, tracker: ExpiryTracker):
     st.header("📊 Dashboard Overview")
     
     # Get statistics
-    stats = db.get_statistics()
-    expiry_status = tracker.check_expiry_status()
+    stats = _cached_stats(db)
+    expiry_status = _cached_expiry(tracker)
     
     # Key Metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -157,45 +259,59 @@ def show_dashboard(db: FridgeDatabase, tracker: ExpiryTracker):
         if stats['by_category']:
             category_df = pd.DataFrame(list(stats['by_category'].items()), 
                                       columns=['Category', 'Count'])
-            fig = px.pie(category_df, values='Count', names='Category', 
-                        color_discrete_sequence=px.colors.qualitative.Set3)
-            st.plotly_chart(fig, use_container_width=True)
+            category_df = _top_categories(category_df, config.DASHBOARD_MAX_PIE_CATEGORIES)
+            st.vega_lite_chart(category_df, {
+                'mark': {'type': 'arc', 'tooltip': True},
+                'encoding': {
+                    'theta': {'field': 'Count', 'type': 'quantitative'},
+                    'color': {'field': 'Category', 'type': 'nominal',
+                              'scale': {'scheme': 'set3'}}
+                }
+            }, use_container_width=True)
         else:
             st.info("No items in inventory")
     
     with col2:
         # Expiry Timeline
         st.subheader("⏰ Expiry Timeline")
-        timeline_data = []
-        for status, items in expiry_status.items():
-            for item in items:
-                timeline_data.append({
-                    'Food': item['name'],
-                    'Days Remaining': item['days_remaining'],
-                    'Status': status.capitalize()
-                })
+        frames = [pd.DataFrame(items).assign(Status=status.capitalize())
+                  for status, items in expiry_status.items() if items]
         
-        if timeline_data:
-            timeline_df = pd.DataFrame(timeline_data)
-            fig = px.bar(timeline_df, x='Food', y='Days Remaining', color='Status',
-                        color_discrete_map={
-                            'Critical': '#f44336',
-                            'Warning': '#ff9800',
-                            'Normal': '#2196f3',
-                            'Fresh': '#4caf50'
-                        })
-            st.plotly_chart(fig, use_container_width=True)
+        if frames:
+            timeline_df = pd.concat(frames, ignore_index=True)[['name', 'days_remaining', 'Status']]
+            timeline_df = timeline_df.rename(columns={'name': 'Food', 'days_remaining': 'Days Remaining'})
+            
+            # Only plot the soonest-expiring items so huge inventories stay responsive
+            if len(timeline_df) > config.DASHBOARD_MAX_TIMELINE_ITEMS:
+                timeline_df = timeline_df.nsmallest(config.DASHBOARD_MAX_TIMELINE_ITEMS, 'Days Remaining')
+                st.caption(f"Showing the {config.DASHBOARD_MAX_TIMELINE_ITEMS} soonest-expiring items")
+            
+            st.vega_lite_chart(timeline_df, {
+                'mark': {'type': 'bar', 'tooltip': True},
+                'encoding': {
+                    'x': {'field': 'Food', 'type': 'nominal', 'sort': None},
+                    'y': {'field': 'Days Remaining', 'type': 'quantitative'},
+                    'color': {'field': 'Status', 'type': 'nominal',
+                              'scale': {'domain': list(STATUS_COLORS),
+                                        'range': list(STATUS_COLORS.values())}}
+                }
+            }, use_container_width=True)
         else:
             st.info("No items to display")
     
     # Recent Items
     st.subheader("🆕 Recently Added Items")
-    all_items = db.get_all_items()
-    if not all_items.empty:
-        recent_items = all_items.head(5)[['name', 'category', 'storage_date', 'expiry_date', 'status']]
+    recent_items = _cached_recent_items(db)
+    if not recent_items.empty:
         st.dataframe(recent_items, use_container_width=True)
     else:
         st.info("No items in inventory")
+    
+    # System workflow diagram
+    if os.path.exists(WORKFLOW_DIAGRAM_PATH):
+        with st.expander("🗺️ System Workflow"):
+            png = _workflow_png(WORKFLOW_DIAGRAM_PATH, os.path.getmtime(WORKFLOW_DIAGRAM_PATH))
+            st.image(png, use_column_width=True)
 
 
 def show_inventory(db: FridgeDatabase):
@@ -230,6 +346,7 @@ def show_inventory(db: FridgeDatabase):
                     'location': location
                 }
                 db.add_food_item(item_data)
+                _invalidate_caches()
                 st.success(f"Added {name} to inventory!")
                 st.rerun()
             else:
@@ -252,81 +369,119 @@ def show_inventory(db: FridgeDatabase):
         items = db.get_items_by_category(filter_category)
     
     if not items.empty:
-        # Display as table with actions
-        for idx, item in items.iterrows():
-            col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-            
-            with col1:
-                st.write(f"**{item['name']}** ({item['category']})")
-            
-            with col2:
-                days_left = (pd.to_datetime(item['expiry_date']) - datetime.now()).days
-                if days_left < 0:
-                    st.error(f"Expired {abs(days_left)} days ago")
-                elif days_left <= 1:
-                    st.error(f"Expires in {days_left} day(s)")
-                elif days_left <= 3:
-                    st.warning(f"Expires in {days_left} days")
-                else:
-                    st.info(f"Expires in {days_left} days")
-            
-            with col3:
-                st.write(f"Qty: {item['quantity']} {item['unit']}")
-            
-            with col4:
-                if st.button("🗑️", key=f"delete_{item['id']}"):
-                    db.delete_item(item['id'])
-                    st.rerun()
-            
-            st.markdown("---")
+        # Compute days left for the whole column in one pass, floored from now like ExpiryTracker
+        expiry = pd.to_datetime(items['expiry_date'], format='%Y-%m-%d', cache=True)
+        items['days_left'] = (expiry - pd.Timestamp.now()) // pd.Timedelta(days=1)
+        items['status'] = _status_messages(items['days_left'].to_numpy(dtype=float))
+        items['delete'] = False
+        
+        # Display as a single editable table with a delete checkbox per row
+        edited = st.data_editor(
+            items[['id', 'name', 'category', 'quantity', 'unit',
+                   'expiry_date', 'days_left', 'status', 'delete']],
+            column_config={
+                'id': None,
+                'name': st.column_config.TextColumn("Food"),
+                'category': st.column_config.TextColumn("Category"),
+                'quantity': st.column_config.NumberColumn("Qty"),
+                'unit': st.column_config.TextColumn("Unit"),
+                'expiry_date': st.column_config.TextColumn("Expiry Date"),
+                'days_left': st.column_config.NumberColumn("Days Left", format="%d days"),
+                'status': st.column_config.TextColumn("Status"),
+                'delete': st.column_config.CheckboxColumn("🗑️", default=False)
+            },
+            disabled=['name', 'category', 'quantity', 'unit', 'expiry_date', 'days_left', 'status'],
+            hide_index=True,
+            num_rows="fixed",
+            use_container_width=True,
+            key=f"inv_editor_{filter_category}"
+        )
+        
+        selected_ids = edited.loc[edited['delete'], 'id']
+        if not selected_ids.empty and st.button(f"🗑️ Delete {len(selected_ids)} selected item(s)"):
+            for item_id in selected_ids:
+                db.delete_item(int(item_id))
+            _invalidate_caches()
+            st.rerun()
     else:
         st.info("No items in inventory")
 
 
-def show_scan_page(db: FridgeDatabase, detector: FoodDetector):
+def show_scan_page(db: FridgeDatabase, detector: 'FoodDetector'):
     """Show scanning interface"""
     
     st.header("📷 Scan Food Items")
     
-    st.info("Upload an image of your fridge contents to automatically detect and add items")
+    st.info("Upload images of your fridge contents (e.g. one per shelf) to automatically detect and add items")
     
-    uploaded_file = st.file_uploader("Choose an image", type=['jpg', 'jpeg', 'png'])
+    uploaded_files = st.file_uploader("Choose images", type=['jpg', 'jpeg', 'png'],
+                                      accept_multiple_files=True)
     
-    if uploaded_file is not None:
-        # Display image
-        st.image(uploaded_file, caption="Uploaded Image", use_column_width=True)
+    if uploaded_files:
+        # Display images
+        st.image([uploaded_file.getvalue() for uploaded_file in uploaded_files],
+                 caption=[uploaded_file.name for uploaded_file in uploaded_files],
+                 use_column_width=True)
         
         if st.button("🔍 Scan and Detect Items"):
-            with st.spinner("Scanning image..."):
-                # Save uploaded file temporarily
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_path = tmp_file.name
-                
-                # Process scan
-                detected_items = detector.process_fridge_scan(tmp_path)
-                
-                if detected_items:
-                    st.success(f"Detected {len(detected_items)} items!")
-                    
-                    # Display detected items
-                    st.subheader("Detected Items:")
-                    for i, item in enumerate(detected_items):
-                        col1, col2, col3 = st.columns([2, 2, 1])
-                        
-                        with col1:
-                            st.write(f"**{item['name']}** ({item['category']})")
-                        
-                        with col2:
-                            st.write(f"Confidence: {item['confidence_score']*100:.1f}%")
-                        
-                        with col3:
-                            if st.button("Add", key=f"add_{i}"):
-                                db.add_food_item(item)
-                                st.success(f"Added {item['name']}!")
+            # Decode the uploads in memory (BGR, same as cv2.imread)
+            import cv2
+            images = []
+            for uploaded_file in uploaded_files:
+                image = cv2.imdecode(np.frombuffer(uploaded_file.getvalue(), np.uint8),
+                                     cv2.IMREAD_COLOR)
+                if image is None:
+                    st.error(f"Could not read {uploaded_file.name}. Please try another file.")
                 else:
-                    st.warning("No items detected. Please try a clearer image or add items manually.")
+                    images.append(image)
+            
+            if images:
+                # Run detection in the background so the page stays responsive;
+                # all images go through one batched detection pass
+                st.session_state['scan_future'] = _get_scan_executor().submit(
+                    detector.process_images, images
+                )
+                st.session_state.pop('scan_results', None)
+    
+    scan_future = st.session_state.get('scan_future')
+    if scan_future is not None:
+        if not scan_future.done():
+            st.info("⏳ Scanning image...")
+            time.sleep(0.5)
+            st.rerun()
+        
+        del st.session_state['scan_future']
+        try:
+            st.session_state['scan_results'] = [item for items in scan_future.result() for item in items]
+        except Exception as e:
+            st.error(f"Scan failed: {e}")
+            return
+    
+    detected_items = st.session_state.get('scan_results')
+    if detected_items is None:
+        return
+    
+    if detected_items:
+        st.success(f"Detected {len(detected_items)} items!")
+        
+        # Display detected items
+        st.subheader("Detected Items:")
+        for i, item in enumerate(detected_items):
+            col1, col2, col3 = st.columns([2, 2, 1])
+            
+            with col1:
+                st.write(f"**{item['name']}** ({item['category']})")
+            
+            with col2:
+                st.write(f"Confidence: {item['confidence_score']*100:.1f}%")
+            
+            with col3:
+                if st.button("Add", key=f"add_{i}"):
+                    db.add_food_item(item)
+                    _invalidate_caches()
+                    st.success(f"Added {item['name']}!")
+    else:
+        st.warning("No items detected. Please try a clearer image or add items manually.")
 
 
 def show_alerts(db: FridgeDatabase, tracker: ExpiryTracker, alert_manager: AlertManager):
@@ -337,6 +492,7 @@ def show_alerts(db: FridgeDatabase, tracker: ExpiryTracker, alert_manager: Alert
     # Generate fresh alerts
     if st.button("🔄 Refresh Alerts"):
         tracker.generate_alerts()
+        _invalidate_caches()
         st.rerun()
     
     # Get unread alerts
@@ -345,38 +501,27 @@ def show_alerts(db: FridgeDatabase, tracker: ExpiryTracker, alert_manager: Alert
     if not alerts.empty:
         st.subheader(f"You have {len(alerts)} unread alerts")
         
-        # Group by level
-        critical_alerts = alerts[alerts['alert_level'] == 'critical']
-        warning_alerts = alerts[alerts['alert_level'] == 'warning']
-        normal_alerts = alerts[alerts['alert_level'] == 'normal']
-        
-        # Critical alerts
-        if not critical_alerts.empty:
-            st.markdown("### 🚨 Critical Alerts")
-            for _, alert in critical_alerts.iterrows():
-                st.markdown(f'<div class="alert-critical">'
-                          f'<strong>{alert["food_name"]}</strong>: {alert["message"]}'
-                          f'</div>', unsafe_allow_html=True)
+        # One markdown block per level instead of one per alert
+        alert_sections = [
+            ('critical', "### 🚨 Critical Alerts"),
+            ('warning', "### ⚠️ Warning Alerts"),
+            ('normal', "### ℹ️ Information")
+        ]
         
-        # Warning alerts
-        if not warning_alerts.empty:
-            st.markdown("### ⚠️ Warning Alerts")
-            for _, alert in warning_alerts.iterrows():
-                st.markdown(f'<div class="alert-warning">'
-                          f'<strong>{alert["food_name"]}</strong>: {alert["message"]}'
-                          f'</div>', unsafe_allow_html=True)
-        
-        # Normal alerts
-        if not normal_alerts.empty:
-            st.markdown("### ℹ️ Information")
-            for _, alert in normal_alerts.iterrows():
-                st.markdown(f'<div class="alert-normal">'
-                          f'<strong>{alert["food_name"]}</strong>: {alert["message"]}'
-                          f'</div>', unsafe_allow_html=True)
+        for level, heading in alert_sections:
+            level_alerts = alerts[alerts['alert_level'] == level]
+            if level_alerts.empty:
+                continue
+            
+            st.markdown(heading)
+            html = ''.join(f'<div class="alert-{level}">'
+                           f'<strong>{alert.food_name}</strong>: {alert.message}'
+                           f'</div>' for alert in level_alerts.itertuples())
+            st.markdown(html, unsafe_allow_html=True)
         
         if st.button("Mark All as Read"):
-            for alert_id in alerts['id']:
-                db.mark_alert_as_read(alert_id)
+            db.mark_alerts_as_read(alerts['id'].tolist())
+            _invalidate_caches()
             st.success("All alerts marked as read!")
             st.rerun()
     else:
@@ -461,8 +606,8 @@ def show_recipes(db: FridgeDatabase, tracker: ExpiryTracker, recipe_gen: RecipeG
                 if st.button("💾 Save Recipe"):
                     recipe_data = {
                         'name': recipe['name'],
-                        'ingredients': str(recipe.get('ingredients', [])),
-                        'instructions': str(recipe.get('instructions', [])),
+                        'ingredients': json.dumps(recipe.get('ingredients', []), separators=(',', ':')),
+                        'instructions': json.dumps(recipe.get('instructions', []), separators=(',', ':')),
                         'cuisine_type': recipe.get('cuisine_type'),
                         'prep_time': recipe.get('prep_time'),
                         'servings': recipe.get('servings'),
@@ -505,10 +650,14 @@ def show_statistics(db: FridgeDatabase, tracker: ExpiryTracker):
     st.subheader("Waste by Category")
     if waste_stats['by_category']:
         waste_df = pd.DataFrame(waste_stats['by_category'])
-        fig = px.bar(waste_df, x='category', y='expired_count', 
-                    title="Expired Items by Category",
-                    labels={'expired_count': 'Expired Items', 'category': 'Category'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.vega_lite_chart(waste_df, {
+            'title': "Expired Items by Category",
+            'mark': {'type': 'bar', 'tooltip': True},
+            'encoding': {
+                'x': {'field': 'category', 'type': 'nominal', 'title': 'Category'},
+                'y': {'field': 'expired_count', 'type': 'quantitative', 'title': 'Expired Items'}
+            }
+        }, use_container_width=True)
     
     # Recommendations
     st.subheader("💡 Recommendations")
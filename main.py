@@ -2,9 +2,13 @@
 Smart Fridge AI System - Main Application
 Orchestrates all components of the system
 """
-import schedule
-import time
-from datetime import datetime
+import asyncio
+import contextlib
+import json
+import threading
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Dict, List
 from loguru import logger
 import sys
 import os
@@ -19,11 +23,44 @@ logger.add(
 )
 
 from src.database import FridgeDatabase
-from src.food_detector import FoodDetector
 from src.expiry_tracker import ExpiryTracker, AlertManager
 from src.recipe_generator import RecipeGenerator
 import src.config as config
 
+if TYPE_CHECKING:
+    from src.food_detector import FoodDetector
+
+
+_BANNER = """
+    ╔═══════════════════════════════════════════════╗
+    ║      SMART FRIDGE AI SYSTEM v1.0             ║
+    ║      Food Preservation & Management           ║
+    ╚═══════════════════════════════════════════════╝
+    
+"""
+
+_MENU = (
+    "\nMain Menu:\n"
+    "1. Scan Fridge\n"
+    "2. Check Alerts\n"
+    "3. Generate Recipe\n"
+    "4. View Status\n"
+    "5. Start Scheduled Tasks\n"
+    "6. Launch Dashboard\n"
+    "7. Exit\n"
+)
+
+
+def _run(main_coro):
+    """Run a coroutine on a uvloop event loop when uvloop is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main_coro)
+    
+    logger.info("Using uvloop event loop")
+    return uvloop.run(main_coro)
+
 
 class SmartFridgeAI:
     """Main application class for Smart Fridge AI System"""
@@ -33,33 +70,43 @@ class SmartFridgeAI:
         
         # Initialize components
         self.db = FridgeDatabase()
-        self.detector = FoodDetector()
         self.tracker = ExpiryTracker(self.db)
         self.alert_manager = AlertManager(self.db)
         self.recipe_gen = RecipeGenerator()
         
+        # Menu and scheduled scans share one detector, so only one scan runs at a time
+        self._scan_lock = threading.Lock()
+        # Menu and scheduled checks must not generate the same alerts twice
+        self._alert_lock = threading.Lock()
+        
         logger.info("All components initialized successfully")
     
+    @cached_property
+    def detector(self) -> 'FoodDetector':
+        """Food detector, imported and created on first scan"""
+        from src.food_detector import FoodDetector
+        
+        return FoodDetector()
+    
     def scan_fridge(self, image_path: str = None):
         """Perform a complete fridge scan"""
         logger.info("Starting fridge scan...")
         
         try:
             # Detect food items
-            detected_items = self.detector.process_fridge_scan(image_path)
+            with self._scan_lock:
+                detected_items = self.detector.process_fridge_scan(image_path)
             
             if not detected_items:
                 logger.warning("No items detected in scan")
                 return
             
-            # Add items to database
-            added_count = 0
-            for item in detected_items:
-                try:
-                    self.db.add_food_item(item)
-                    added_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to add item {item.get('name')}: {e}")
+            # Add items to database in a single transaction
+            try:
+                added_count = self.db.add_food_items_bulk(detected_items)
+            except Exception as e:
+                logger.error(f"Failed to add scanned items: {e}")
+                added_count = 0
             
             logger.info(f"Scan complete: {added_count} items added to database")
             
@@ -77,72 +124,68 @@ class SmartFridgeAI:
         logger.info("Checking expiry status...")
         
         try:
-            # Generate alerts
-            self.tracker.generate_alerts()
+            # Generate alerts (also sends the combined critical notification)
+            with self._alert_lock:
+                critical_count = self.tracker.generate_alerts()
             
-            # Get critical alerts
-            alerts = self.db.get_unread_alerts()
-            critical_alerts = alerts[alerts['alert_level'] == 'critical']
-            
-            if not critical_alerts.empty:
-                logger.warning(f"Found {len(critical_alerts)} critical alerts")
-                
-                # Send notifications if enabled
-                if config.ENABLE_DESKTOP_NOTIFICATIONS:
-                    for _, alert in critical_alerts.iterrows():
-                        self.alert_manager._send_desktop_notification(
-                            "Critical Food Alert",
-                            alert['message']
-                        )
+            if critical_count:
+                logger.warning(f"Found {critical_count} critical alerts")
             
             logger.info("Alert check complete")
             
         except Exception as e:
             logger.error(f"Alert check failed: {e}")
     
-    def generate_recipe_from_expiring_items(self):
-        """Generate recipe using expiring ingredients"""
-        logger.info("Generating recipe from expiring items...")
+    async def generate_recipes_from_expiring_items(self):
+        """Generate recipes from expiring ingredients, one per group of up to MAX_INGREDIENTS_FOR_RECIPE"""
+        logger.info("Generating recipes from expiring items...")
+        loop = asyncio.get_running_loop()
+        group_size = config.MAX_INGREDIENTS_FOR_RECIPE
         
         try:
             # Get expiring items
-            expiring_items = self.tracker.get_items_for_recipe()
+            expiring_items = await loop.run_in_executor(
+                None, self.tracker.get_items_for_recipe, group_size * config.MAX_RECIPES_PER_RUN
+            )
             
             if not expiring_items:
                 logger.info("No expiring items for recipe generation")
-                return None
+                return []
             
-            # Extract ingredient names
+            # Split ingredient names into groups, one recipe each, generated concurrently
             ingredients = [item['name'] for item in expiring_items]
+            groups = [ingredients[start:start + group_size]
+                      for start in range(0, len(ingredients), group_size)]
+            recipes = await self.recipe_gen.generate_recipes_async(groups)
             
-            # Generate recipe
-            recipe = self.recipe_gen.generate_recipe(ingredients)
-            
-            # Save to database
-            recipe_data = {
-                'name': recipe['name'],
-                'ingredients': str(recipe.get('ingredients', [])),
-                'instructions': str(recipe.get('instructions', [])),
-                'cuisine_type': recipe.get('cuisine_type'),
-                'prep_time': recipe.get('prep_time'),
-                'servings': recipe.get('servings'),
-                'used_items': ','.join(ingredients)
-            }
-            
-            self.db.save_recipe(recipe_data)
-            
-            logger.info(f"Recipe generated: {recipe['name']}")
-            
-            # Print recipe
-            print("\n" + "="*50)
-            print(self.recipe_gen.format_recipe_for_display(recipe))
-            print("="*50 + "\n")
-            
-            return recipe
+            for recipe, group in zip(recipes, groups):
+                await loop.run_in_executor(None, self._save_and_print_recipe, recipe, group)
+            return recipes
             
         except Exception as e:
             logger.error(f"Recipe generation failed: {e}")
-            return None
+            return []
+    
+    def _save_and_print_recipe(self, recipe: Dict, ingredients: List[str]):
+        """Save a generated recipe to the database and print it"""
+        recipe_data = {
+            'name': recipe['name'],
+            'ingredients': json.dumps(recipe.get('ingredients', []), separators=(',', ':')),
+            'instructions': json.dumps(recipe.get('instructions', []), separators=(',', ':')),
+            'cuisine_type': recipe.get('cuisine_type'),
+            'prep_time': recipe.get('prep_time'),
+            'servings': recipe.get('servings'),
+            'used_items': ','.join(ingredients)
+        }
+        
+        self.db.save_recipe(recipe_data)
+        
+        logger.info(f"Recipe generated: {recipe['name']}")
+        
+        # Print recipe
+        print("\n" + "="*50)
+        print(self.recipe_gen.format_recipe_for_display(recipe))
+        print("="*50 + "\n")
     
     def get_system_status(self):
         """Get current system status"""
@@ -165,27 +208,50 @@ class SmartFridgeAI:
             logger.error(f"Failed to get system status: {e}")
             return None
     
-    def run_scheduled_tasks(self):
-        """Setup and run scheduled tasks"""
-        logger.info("Setting up scheduled tasks...")
+    async def _run_periodic(self, interval_seconds: float, job: Callable):
+        """Run a blocking job in the executor every interval_seconds"""
+        loop = asyncio.get_running_loop()
+        # Deadlines on the loop's monotonic clock, so job run time doesn't push the schedule
+        next_run = loop.time() + interval_seconds
+        while True:
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+            await loop.run_in_executor(None, job)
+            
+            next_run += interval_seconds
+            # Skip runs missed while an overlong job was executing
+            while next_run <= loop.time():
+                next_run += interval_seconds
+    
+    async def _run_daily(self, at: str, job: Callable):
+        """Run a blocking job in the executor every day at the given HH:MM"""
+        loop = asyncio.get_running_loop()
+        hour, minute = (int(part) for part in at.split(':'))
+        while True:
+            now = datetime.now()
+            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= now:
+                target += timedelta(days=1)
+            
+            await asyncio.sleep((target - now).total_seconds())
+            await loop.run_in_executor(None, job)
+    
+    async def _scheduler_main(self):
+        """Run every scheduled job as its own task until cancelled"""
+        tasks = []
         
         # Schedule automatic scans
         if config.AUTO_SCAN_ENABLED:
-            schedule.every(config.SCAN_INTERVAL_HOURS).hours.do(
-                self.scan_fridge
-            )
+            tasks.append(asyncio.create_task(
+                self._run_periodic(config.SCAN_INTERVAL_HOURS * 3600, self.scan_fridge)
+            ))
             logger.info(f"Auto-scan scheduled every {config.SCAN_INTERVAL_HOURS} hours")
         
         # Schedule daily expiry checks
-        schedule.every().day.at("08:00").do(self.check_and_alert)
-        schedule.every().day.at("18:00").do(self.check_and_alert)
+        for at in config.DAILY_ALERT_TIMES:
+            tasks.append(asyncio.create_task(self._run_daily(at, self.check_and_alert)))
         
         logger.info("Scheduled tasks configured. Running scheduler...")
-        
-        # Run scheduler
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        await asyncio.gather(*tasks)
     
     def print_status(self):
         """Print current system status"""
@@ -206,75 +272,102 @@ class SmartFridgeAI:
             print("="*50 + "\n")
 
 
-def main():
-    """Main entry point"""
-    print("""
-    ╔═══════════════════════════════════════════════╗
-    ║      SMART FRIDGE AI SYSTEM v1.0             ║
-    ║      Food Preservation & Management           ║
-    ╚═══════════════════════════════════════════════╝
-    """)
+async def _ainput(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(future.set_result, line)
+    
+    # A daemon thread, unlike the default executor, never holds up exit while waiting on input
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def main_async():
+    """Interactive menu, with the scheduler able to run in the background"""
+    sys.stdout.write(_BANNER)
+    loop = asyncio.get_running_loop()
     
     # Initialize system
     system = SmartFridgeAI()
     
     # Print initial status
-    system.print_status()
+    await loop.run_in_executor(None, system.print_status)
     
-    # Menu
-    while True:
-        print("\nMain Menu:")
-        print("1. Scan Fridge")
-        print("2. Check Alerts")
-        print("3. Generate Recipe")
-        print("4. View Status")
-        print("5. Start Scheduled Tasks")
-        print("6. Launch Dashboard")
-        print("7. Exit")
-        
-        choice = input("\nEnter your choice (1-7): ")
-        
-        if choice == '1':
-            image_path = input("Enter image path (or press Enter to use camera): ").strip()
-            image_path = image_path if image_path else None
-            system.scan_fridge(image_path)
-        
-        elif choice == '2':
-            system.check_and_alert()
-            alerts = system.db.get_unread_alerts()
-            if not alerts.empty:
-                print(f"\nYou have {len(alerts)} unread alerts:")
-                for _, alert in alerts.iterrows():
-                    print(f"  [{alert['alert_level'].upper()}] {alert['food_name']}: {alert['message']}")
+    scheduler_task = None
+    try:
+        # Menu
+        while True:
+            sys.stdout.write(_MENU)
+            sys.stdout.flush()
+            
+            choice = await _ainput("\nEnter your choice (1-7): ")
+            
+            if choice == '1':
+                image_path = (await _ainput("Enter image path (or press Enter to use camera): ")).strip()
+                image_path = image_path if image_path else None
+                await loop.run_in_executor(None, system.scan_fridge, image_path)
+            
+            elif choice == '2':
+                await loop.run_in_executor(None, system.check_and_alert)
+                alerts = await loop.run_in_executor(None, system.db.get_unread_alerts)
+                if not alerts.empty:
+                    lines = [f"\nYou have {len(alerts)} unread alerts:"]
+                    lines.extend(f"  [{level.upper()}] {food_name}: {message}"
+                                 for level, food_name, message in zip(alerts['alert_level'].tolist(),
+                                                                      alerts['food_name'].tolist(),
+                                                                      alerts['message'].tolist()))
+                    print("\n".join(lines))
+                else:
+                    print("\n✅ No pending alerts!")
+            
+            elif choice == '3':
+                await system.generate_recipes_from_expiring_items()
+            
+            elif choice == '4':
+                await loop.run_in_executor(None, system.print_status)
+            
+            elif choice == '5':
+                if scheduler_task is not None and not scheduler_task.done():
+                    print("\nScheduled tasks are already running.")
+                else:
+                    scheduler_task = asyncio.create_task(system._scheduler_main())
+                    print("\nScheduled tasks running in the background. The menu stays available.")
+            
+            elif choice == '6':
+                print("\nLaunching dashboard...")
+                print("Run: streamlit run dashboard.py")
+                print("Dashboard will open in your browser at http://localhost:8501")
+                break
+            
+            elif choice == '7':
+                print("\nThank you for using Smart Fridge AI!")
+                logger.info("System shutdown")
+                break
+            
             else:
-                print("\n✅ No pending alerts!")
-        
-        elif choice == '3':
-            system.generate_recipe_from_expiring_items()
-        
-        elif choice == '4':
-            system.print_status()
-        
-        elif choice == '5':
-            print("\nStarting scheduled tasks... (Press Ctrl+C to stop)")
-            try:
-                system.run_scheduled_tasks()
-            except KeyboardInterrupt:
-                print("\nScheduler stopped.")
-        
-        elif choice == '6':
-            print("\nLaunching dashboard...")
-            print("Run: streamlit run dashboard.py")
-            print("Dashboard will open in your browser at http://localhost:8501")
-            break
-        
-        elif choice == '7':
-            print("\nThank you for using Smart Fridge AI!")
-            logger.info("System shutdown")
-            break
-        
-        else:
-            print("\nInvalid choice. Please try again.")
+                print("\nInvalid choice. Please try again.")
+    
+    finally:
+        if scheduler_task is not None:
+            scheduler_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await scheduler_task
+
+
+def main():
+    """Main entry point"""
+    try:
+        _run(main_async())
+    except (KeyboardInterrupt, EOFError):
+        print("\nStopped.")
 
 
 if __name__ == "__main__":
@@ -7,10 +7,17 @@ __version__ = '1.0.0'
 __author__ = 'Smart Fridge AI Team'
 __license__ = 'MIT'
 
-from .database import FridgeDatabase
-from .food_detector import FoodDetector
-from .expiry_tracker import ExpiryTracker, AlertManager
-from .recipe_generator import RecipeGenerator
+import importlib
+
+# Public classes are imported on first access, so importing one submodule
+# (e.g. src.database) does not drag in the computer vision stack
+_EXPORTS = {
+    'FridgeDatabase': '.database',
+    'FoodDetector': '.food_detector',
+    'ExpiryTracker': '.expiry_tracker',
+    'AlertManager': '.expiry_tracker',
+    'RecipeGenerator': '.recipe_generator'
+}
 
 __all__ = [
     'FridgeDatabase',
@@ -19,3 +26,10 @@ __all__ = [
     'AlertManager',
     'RecipeGenerator'
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,6 +9,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Database Configuration
 DATABASE_PATH = os.path.join(BASE_DIR, 'data', 'smart_fridge.db')
+DATABASE_POOL_SIZE = 4  # Connections kept open and reused across queries
+STATS_CACHE_TTL_SECONDS = 5  # How long get_statistics/get_unread_alerts results are reused
 
 # Model Paths
 FOOD_DETECTION_MODEL = os.path.join(BASE_DIR, 'models', 'yolov8_food.pt')
@@ -57,6 +59,8 @@ DEFAULT_SHELF_LIFE = {
 # Dashboard Configuration
 DASHBOARD_PORT = 8050
 DASHBOARD_HOST = '0.0.0.0'
+DASHBOARD_MAX_PIE_CATEGORIES = 10      # Remaining categories are grouped as "Other"
+DASHBOARD_MAX_TIMELINE_ITEMS = 1000    # Soonest-expiring items shown on the timeline
 
 # API Configuration
 API_PORT = 5000
@@ -81,6 +85,7 @@ TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '')
 # Recipe Generation
 RECIPE_API_KEY = os.getenv('OPENAI_API_KEY', '')  # For AI-powered recipe generation
 MAX_INGREDIENTS_FOR_RECIPE = 10
+MAX_RECIPES_PER_RUN = 3  # Recipes generated concurrently when more items are expiring than fit in one
 
 # Logging
 LOG_LEVEL = 'INFO'
@@ -89,3 +94,4 @@ LOG_FILE = os.path.join(BASE_DIR, 'logs', 'smart_fridge.log')
 # Scan Schedule
 AUTO_SCAN_ENABLED = True
 SCAN_INTERVAL_HOURS = 12  # Scan every 12 hours
+DAILY_ALERT_TIMES = ('08:00', '18:00')  # Local times for the daily expiry check
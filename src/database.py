@@ -1,12 +1,117 @@
 """
 Database Management for Smart Fridge AI System
 """
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import pandas as pd
 from loguru import logger
-import config
+from . import config
+
+
+# Statements are kept as constants so pooled connections reuse their cached prepared form
+_SQL_INSERT_FOOD = '''
+    INSERT INTO food_items 
+    (name, category, quantity, unit, expiry_date, location, barcode, 
+     image_path, confidence_score, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_SELECT_ITEMS = '''
+    SELECT * FROM food_items 
+    WHERE status != 'consumed' OR ? = 1
+    ORDER BY expiry_date ASC
+'''
+
+# id is the rowid, so this walks the primary key backwards and stops at limit
+_SQL_SELECT_RECENT = '''
+    SELECT name, category, storage_date, expiry_date, status
+    FROM food_items 
+    WHERE status != 'consumed'
+    ORDER BY id DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_BY_CATEGORY = '''
+    SELECT * FROM food_items 
+    WHERE category = ? AND status != 'consumed'
+    ORDER BY expiry_date ASC
+'''
+
+# A negative LIMIT means no limit in SQLite
+_SQL_SELECT_EXPIRING = '''
+    SELECT * FROM food_items 
+    WHERE expiry_date <= ? AND status = 'fresh'
+    ORDER BY expiry_date ASC
+    LIMIT ?
+'''
+
+_SQL_UPDATE_STATUS = '''
+    UPDATE food_items 
+    SET status = ?, last_updated = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_INSERT_ALERT = '''
+    INSERT INTO alerts (food_item_id, alert_type, alert_level, message)
+    VALUES (?, ?, ?, ?)
+'''
+
+_SQL_SELECT_UNREAD_ALERTS = '''
+    SELECT a.*, f.name as food_name 
+    FROM alerts a
+    JOIN food_items f ON a.food_item_id = f.id
+    WHERE a.is_read = 0
+    ORDER BY a.created_date DESC
+'''
+
+_SQL_MARK_ALERT_READ = 'UPDATE alerts SET is_read = 1 WHERE id = ?'
+
+_SQL_INSERT_RECIPE = '''
+    INSERT INTO generated_recipes 
+    (recipe_name, ingredients, instructions, cuisine_type, 
+     preparation_time, servings, used_items)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_DELETE_ITEM = 'DELETE FROM food_items WHERE id = ?'
+
+# LEFT JOIN onto a single dummy row keeps the totals when there are no fresh items
+_SQL_STATISTICS = '''
+    SELECT c.category, COALESCE(c.count, 0),
+           (SELECT COUNT(*) FROM food_items WHERE status = 'fresh'),
+           (SELECT COUNT(*) FROM food_items WHERE expiry_date <= ? AND status = 'fresh'),
+           (SELECT COUNT(*) FROM alerts WHERE is_read = 0)
+    FROM (SELECT 1)
+    LEFT JOIN (
+        SELECT category, COUNT(*) AS count
+        FROM food_items
+        WHERE status = 'fresh'
+        GROUP BY category
+    ) c
+'''
+
+# Templates for _execute_in_chunks; {placeholders} becomes the IN list
+_SQL_BULK_UPDATE_STATUS = '''
+    UPDATE food_items 
+    SET status = ?, last_updated = CURRENT_TIMESTAMP
+    WHERE id IN ({placeholders})
+'''
+
+_SQL_BULK_MARK_ALERTS_READ = 'UPDATE alerts SET is_read = 1 WHERE id IN ({placeholders})'
+
+
+def _execute_in_chunks(cursor: sqlite3.Cursor, sql_template: str, ids: List[int],
+                       leading_params: tuple = (), chunk_size: int = 500):
+    """Run an ``IN ({placeholders})`` statement over ids in chunks, staying under SQLite's host parameter limit"""
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(sql_template.format(placeholders=placeholders), [*leading_params, *chunk])
 
 
 class FridgeDatabase:
@@ -14,95 +119,153 @@ class FridgeDatabase:
     
     def __init__(self, db_path: str = config.DATABASE_PATH):
         self.db_path = db_path
+        self._pool = queue.Queue()
+        for _ in range(config.DATABASE_POOL_SIZE):
+            self._pool.put(self._create_connection())
+        # Bumped by every write so cached reads never outlive a change
+        self._mutation_epoch = 0
+        self._epoch_lock = threading.Lock()
+        self._stats_cache = None
+        self._alerts_cache = None
         self.initialize_database()
     
+    def _create_connection(self) -> sqlite3.Connection:
+        """Open a connection that may be shared across threads via the pool"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL lets readers run alongside the writer and avoids an fsync per commit
+        conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-65536;
+            PRAGMA mmap_size=268435456;
+        ''')
+        return conn
+    
+    @contextmanager
     def get_connection(self):
-        """Create and return a database connection"""
-        return sqlite3.connect(self.db_path)
+        """Borrow a pooled connection, committing on success and rolling back on error"""
+        conn = self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+    
+    def close(self):
+        """Close all pooled connections"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+    
+    def _bump_mutation_epoch(self):
+        """Record a write; writes may come from several executor threads at once"""
+        with self._epoch_lock:
+            self._mutation_epoch += 1
+    
+    def _cache_lookup(self, entry: Optional[tuple]):
+        """Return a cached value if it is within the TTL and nothing has been written since"""
+        if entry is None:
+            return None
+        
+        timestamp, epoch, value = entry
+        if epoch != self._mutation_epoch or time.monotonic() - timestamp >= config.STATS_CACHE_TTL_SECONDS:
+            return None
+        return value
     
     def initialize_database(self):
         """Create tables if they don't exist"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Food Items Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS food_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT,
-                quantity INTEGER DEFAULT 1,
-                unit TEXT,
-                storage_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expiry_date DATE,
-                location TEXT,
-                barcode TEXT,
-                image_path TEXT,
-                confidence_score REAL,
-                status TEXT DEFAULT 'fresh',
-                notes TEXT,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Food Items Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS food_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    category TEXT,
+                    quantity INTEGER DEFAULT 1,
+                    unit TEXT,
+                    storage_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    expiry_date DATE,
+                    location TEXT,
+                    barcode TEXT,
+                    image_path TEXT,
+                    confidence_score REAL,
+                    status TEXT DEFAULT 'fresh',
+                    notes TEXT,
+                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Alerts Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    food_item_id INTEGER,
+                    alert_type TEXT,
+                    alert_level TEXT,
+                    message TEXT,
+                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_read BOOLEAN DEFAULT 0,
+                    FOREIGN KEY (food_item_id) REFERENCES food_items (id)
+                )
+            ''')
+            
+            # Consumption History Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS consumption_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    food_item_id INTEGER,
+                    food_name TEXT,
+                    category TEXT,
+                    consumed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    was_expired BOOLEAN DEFAULT 0,
+                    waste_amount REAL,
+                    FOREIGN KEY (food_item_id) REFERENCES food_items (id)
+                )
+            ''')
+            
+            # Recipes Table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS generated_recipes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recipe_name TEXT,
+                    ingredients TEXT,
+                    instructions TEXT,
+                    cuisine_type TEXT,
+                    preparation_time INTEGER,
+                    servings INTEGER,
+                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    used_items TEXT
+                )
+            ''')
+            
+            # Indexes for the status/expiry/category filters and alert lookups
+            cursor.executescript('''
+                CREATE INDEX IF NOT EXISTS idx_food_items_status_expiry
+                    ON food_items (status, expiry_date);
+                CREATE INDEX IF NOT EXISTS idx_food_items_category_status
+                    ON food_items (category, status);
+                CREATE INDEX IF NOT EXISTS idx_alerts_unread_created
+                    ON alerts (is_read, created_date DESC);
+                CREATE INDEX IF NOT EXISTS idx_alerts_food_item
+                    ON alerts (food_item_id);
+                CREATE INDEX IF NOT EXISTS idx_consumption_date_category
+                    ON consumption_history (consumed_date, category);
+            ''')
         
-        # Alerts Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                food_item_id INTEGER,
-                alert_type TEXT,
-                alert_level TEXT,
-                message TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_read BOOLEAN DEFAULT 0,
-                FOREIGN KEY (food_item_id) REFERENCES food_items (id)
-            )
-        ''')
-        
-        # Consumption History Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS consumption_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                food_item_id INTEGER,
-                food_name TEXT,
-                category TEXT,
-                consumed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                was_expired BOOLEAN DEFAULT 0,
-                waste_amount REAL,
-                FOREIGN KEY (food_item_id) REFERENCES food_items (id)
-            )
-        ''')
-        
-        # Recipes Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS generated_recipes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                recipe_name TEXT,
-                ingredients TEXT,
-                instructions TEXT,
-                cuisine_type TEXT,
-                preparation_time INTEGER,
-                servings INTEGER,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                used_items TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
         logger.info("Database initialized successfully")
     
-    def add_food_item(self, item_data: Dict) -> int:
-        """Add a new food item to the database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO food_items 
-            (name, category, quantity, unit, expiry_date, location, barcode, 
-             image_path, confidence_score, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _food_item_params(item_data: Dict) -> tuple:
+        """Parameters for _SQL_INSERT_FOOD, with defaults for missing fields"""
+        return (
             item_data.get('name'),
             item_data.get('category'),
             item_data.get('quantity', 1),
@@ -113,191 +276,219 @@ class FridgeDatabase:
             item_data.get('image_path'),
             item_data.get('confidence_score'),
             item_data.get('notes')
-        ))
-        
-        item_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
+        )
+    
+    def add_food_item(self, item_data: Dict) -> int:
+        """Add a new food item to the database"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_INSERT_FOOD, self._food_item_params(item_data))
+            
+            item_id = cursor.lastrowid
+        
+        self._bump_mutation_epoch()
         logger.info(f"Added food item: {item_data.get('name')} (ID: {item_id})")
         return item_id
     
+    def add_food_items_bulk(self, items: List[Dict]) -> int:
+        """Add many food items in one transaction, returning how many were inserted"""
+        if not items:
+            return 0
+        
+        with self.get_connection() as conn:
+            conn.executemany(_SQL_INSERT_FOOD, [self._food_item_params(item) for item in items])
+        
+        self._bump_mutation_epoch()
+        logger.info(f"Added {len(items)} food items")
+        return len(items)
+    
     def get_all_items(self, include_consumed: bool = False) -> pd.DataFrame:
         """Retrieve all food items"""
-        conn = self.get_connection()
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(_SQL_SELECT_ITEMS, conn, params=(include_consumed,))
         
-        query = '''
-            SELECT * FROM food_items 
-            WHERE status != 'consumed' OR ? = 1
-            ORDER BY expiry_date ASC
-        '''
-        
-        df = pd.read_sql_query(query, conn, params=(include_consumed,))
-        conn.close()
+        return df
+    
+    def get_all_items_rows(self, include_consumed: bool = False) -> List[sqlite3.Row]:
+        """Retrieve all food items as rows, skipping DataFrame construction"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute(_SQL_SELECT_ITEMS, (include_consumed,))
+            rows = cursor.fetchall()
+        
+        return rows
+    
+    def get_recent_items(self, limit: int = 5) -> pd.DataFrame:
+        """Get the most recently added items"""
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(_SQL_SELECT_RECENT, conn, params=(limit,))
         
         return df
     
     def get_items_by_category(self, category: str) -> pd.DataFrame:
         """Get items filtered by category"""
-        conn = self.get_connection()
-        
-        query = '''
-            SELECT * FROM food_items 
-            WHERE category = ? AND status != 'consumed'
-            ORDER BY expiry_date ASC
-        '''
-        
-        df = pd.read_sql_query(query, conn, params=(category,))
-        conn.close()
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(_SQL_SELECT_BY_CATEGORY, conn, params=(category,))
         
         return df
     
     def get_expiring_items(self, days_threshold: int = 3) -> pd.DataFrame:
         """Get items expiring within specified days"""
-        conn = self.get_connection()
-        
         threshold_date = (datetime.now() + timedelta(days=days_threshold)).strftime('%Y-%m-%d')
         
-        query = '''
-            SELECT * FROM food_items 
-            WHERE expiry_date <= ? AND status = 'fresh'
-            ORDER BY expiry_date ASC
-        '''
-        
-        df = pd.read_sql_query(query, conn, params=(threshold_date,))
-        conn.close()
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(_SQL_SELECT_EXPIRING, conn, params=(threshold_date, -1))
         
         return df
     
-    def update_item_status(self, item_id: int, status: str):
-        """Update the status of a food item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_expiring_items_rows(self, days_threshold: int = 3,
+                                limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Get items expiring within specified days as rows"""
+        threshold_date = (datetime.now() + timedelta(days=days_threshold)).strftime('%Y-%m-%d')
         
-        cursor.execute('''
-            UPDATE food_items 
-            SET status = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (status, item_id))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute(_SQL_SELECT_EXPIRING, (threshold_date, -1 if limit is None else limit))
+            rows = cursor.fetchall()
         
-        conn.commit()
-        conn.close()
+        return rows
+    
+    def update_item_status(self, item_id: int, status: str):
+        """Update the status of a food item"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_UPDATE_STATUS, (status, item_id))
         
+        self._bump_mutation_epoch()
         logger.info(f"Updated item {item_id} status to {status}")
     
+    def bulk_update_status(self, item_ids: List[int], status: str, chunk_size: int = 500):
+        """Update the status of many food items in one transaction"""
+        if not item_ids:
+            return
+        
+        ids = [int(item_id) for item_id in item_ids]
+        with self.get_connection() as conn:
+            _execute_in_chunks(conn.cursor(), _SQL_BULK_UPDATE_STATUS, ids,
+                               leading_params=(status,), chunk_size=chunk_size)
+        
+        self._bump_mutation_epoch()
+        logger.info(f"Updated {len(ids)} items to status {status}")
+    
     def create_alert(self, food_item_id: int, alert_type: str, 
                      alert_level: str, message: str):
         """Create a new alert"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_INSERT_ALERT, (food_item_id, alert_type, alert_level, message))
         
-        cursor.execute('''
-            INSERT INTO alerts (food_item_id, alert_type, alert_level, message)
-            VALUES (?, ?, ?, ?)
-        ''', (food_item_id, alert_type, alert_level, message))
+        self._bump_mutation_epoch()
+        logger.info(f"Created {alert_level} alert for item {food_item_id}")
+    
+    def bulk_create_alerts(self, rows: List[tuple]):
+        """Create many alerts in one transaction from (food_item_id, alert_type, alert_level, message) rows"""
+        if not rows:
+            return
         
-        conn.commit()
-        conn.close()
+        with self.get_connection() as conn:
+            conn.executemany(_SQL_INSERT_ALERT, rows)
         
-        logger.info(f"Created {alert_level} alert for item {food_item_id}")
+        self._bump_mutation_epoch()
+        logger.info(f"Created {len(rows)} alerts")
     
     def get_unread_alerts(self) -> pd.DataFrame:
         """Get all unread alerts"""
-        conn = self.get_connection()
-        
-        query = '''
-            SELECT a.*, f.name as food_name 
-            FROM alerts a
-            JOIN food_items f ON a.food_item_id = f.id
-            WHERE a.is_read = 0
-            ORDER BY a.created_date DESC
-        '''
+        cached = self._cache_lookup(self._alerts_cache)
+        if cached is not None:
+            return cached.copy()
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        epoch = self._mutation_epoch
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(_SQL_SELECT_UNREAD_ALERTS, conn)
         
-        return df
+        self._alerts_cache = (time.monotonic(), epoch, df)
+        return df.copy()
     
     def mark_alert_as_read(self, alert_id: int):
         """Mark an alert as read"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_MARK_ALERT_READ, (alert_id,))
         
-        cursor.execute('UPDATE alerts SET is_read = 1 WHERE id = ?', (alert_id,))
+        self._bump_mutation_epoch()
+    
+    def mark_alerts_as_read(self, alert_ids: List[int], chunk_size: int = 500):
+        """Mark several alerts as read in one transaction"""
+        if not alert_ids:
+            return
         
-        conn.commit()
-        conn.close()
+        ids = [int(alert_id) for alert_id in alert_ids]
+        with self.get_connection() as conn:
+            _execute_in_chunks(conn.cursor(), _SQL_BULK_MARK_ALERTS_READ, ids, chunk_size=chunk_size)
+        
+        self._bump_mutation_epoch()
     
     def save_recipe(self, recipe_data: Dict) -> int:
         """Save a generated recipe"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO generated_recipes 
-            (recipe_name, ingredients, instructions, cuisine_type, 
-             preparation_time, servings, used_items)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            recipe_data.get('name'),
-            recipe_data.get('ingredients'),
-            recipe_data.get('instructions'),
-            recipe_data.get('cuisine_type'),
-            recipe_data.get('prep_time'),
-            recipe_data.get('servings'),
-            recipe_data.get('used_items')
-        ))
-        
-        recipe_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_INSERT_RECIPE, (
+                recipe_data.get('name'),
+                recipe_data.get('ingredients'),
+                recipe_data.get('instructions'),
+                recipe_data.get('cuisine_type'),
+                recipe_data.get('prep_time'),
+                recipe_data.get('servings'),
+                recipe_data.get('used_items')
+            ))
+            
+            recipe_id = cursor.lastrowid
         
         return recipe_id
     
     def get_statistics(self) -> Dict:
         """Get summary statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        stats = {}
-        
-        # Total items
-        cursor.execute('SELECT COUNT(*) FROM food_items WHERE status = "fresh"')
-        stats['total_items'] = cursor.fetchone()[0]
-        
-        # Items by category
-        cursor.execute('''
-            SELECT category, COUNT(*) as count 
-            FROM food_items 
-            WHERE status = "fresh"
-            GROUP BY category
-        ''')
-        stats['by_category'] = dict(cursor.fetchall())
-        
-        # Expiring soon (within 3 days)
-        threshold_date = (datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT COUNT(*) FROM food_items 
-            WHERE expiry_date <= ? AND status = "fresh"
-        ''', (threshold_date,))
-        stats['expiring_soon'] = cursor.fetchone()[0]
-        
-        # Unread alerts
-        cursor.execute('SELECT COUNT(*) FROM alerts WHERE is_read = 0')
-        stats['unread_alerts'] = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return stats
+        cached = self._cache_lookup(self._stats_cache)
+        if cached is not None:
+            return dict(cached)
+        
+        epoch = self._mutation_epoch
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Expiring soon (within 3 days)
+            threshold_date = (datetime.now() + timedelta(days=3)).strftime('%Y-%m-%d')
+            
+            # Per-category counts, with scalar totals repeated on every row
+            cursor.execute(_SQL_STATISTICS, (threshold_date,))
+            rows = cursor.fetchall()
+        
+        total_items, expiring_soon, unread_alerts = rows[0][2:]
+        stats = {
+            'total_items': total_items,
+            'by_category': {category: count for category, count, *_ in rows if count},
+            'expiring_soon': expiring_soon,
+            'unread_alerts': unread_alerts
+        }
+        
+        self._stats_cache = (time.monotonic(), epoch, stats)
+        return dict(stats)
     
     def delete_item(self, item_id: int):
         """Delete a food item"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM food_items WHERE id = ?', (item_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(_SQL_DELETE_ITEM, (item_id,))
         
+        self._bump_mutation_epoch()
         logger.info(f"Deleted food item: {item_id}")
@@ -3,11 +3,53 @@ Expiry Tracking and Alert System
 """
 from datetime import datetime, timedelta
 from typing import List, Dict
+import numpy as np
 import pandas as pd
 from loguru import logger
-from plyer import notification
-import config
-from database import FridgeDatabase
+from . import config
+from .database import FridgeDatabase
+
+
+def _days_remaining(expiry_dates: List[str], now: datetime) -> np.ndarray:
+    """Whole days from now until each 'YYYY-MM-DD' expiry date, in one vectorized pass"""
+    dates = np.array(expiry_dates, dtype='datetime64[D]')
+    # Floor division matches timedelta.days for expiry at midnight minus the current time
+    return (dates - np.datetime64(now, 's')) // np.timedelta64(1, 'D')
+
+
+# Critical messages listed in a combined notification before the rest are summarized
+_MAX_NOTIFICATION_LINES = 5
+
+
+def _send_desktop_notification(title: str, message: str):
+    """Send desktop notification"""
+    try:
+        from plyer import notification
+        
+        notification.notify(
+            title=title,
+            message=message,
+            app_name='Smart Fridge AI',
+            timeout=10
+        )
+    except Exception as e:
+        logger.warning(f"Desktop notification failed: {e}")
+
+
+def _send_critical_notification(messages: List[str]):
+    """Send one desktop notification covering all critical alert messages"""
+    if not messages:
+        return
+    
+    if len(messages) == 1:
+        _send_desktop_notification('Critical Alert', messages[0])
+        return
+    
+    lines = messages[:_MAX_NOTIFICATION_LINES]
+    if len(messages) > _MAX_NOTIFICATION_LINES:
+        lines.append(f"...and {len(messages) - _MAX_NOTIFICATION_LINES} more")
+    _send_desktop_notification('Critical Alerts',
+                               f"{len(messages)} items need attention:\n" + "\n".join(lines))
 
 
 class ExpiryTracker:
@@ -19,9 +61,9 @@ class ExpiryTracker:
     
     def check_expiry_status(self) -> Dict:
         """Check expiry status of all items"""
-        items = self.db.get_all_items()
+        items = self.db.get_all_items_rows()
         
-        if items.empty:
+        if not items:
             logger.info("No items to check")
             return {'critical': [], 'warning': [], 'normal': [], 'fresh': []}
         
@@ -33,46 +75,39 @@ class ExpiryTracker:
             'fresh': []
         }
         
-        for _, item in items.iterrows():
-            if pd.isna(item['expiry_date']):
-                continue
-            
-            expiry_date = pd.to_datetime(item['expiry_date'])
-            days_until_expiry = (expiry_date - now).days
-            
-            item_info = {
+        dated = [item for item in items if item['expiry_date'] is not None]
+        ids = np.array([item['id'] for item in dated], dtype=np.int64)
+        days = _days_remaining([item['expiry_date'] for item in dated], now)
+        levels = np.select(
+            [days <= self.alert_thresholds['critical'],
+             days <= self.alert_thresholds['warning'],
+             days <= self.alert_thresholds['normal']],
+            ['critical', 'warning', 'normal'],
+            default='fresh'
+        )
+        expired_ids = ids[days < 0].tolist()
+        
+        for item, days_until_expiry, level in zip(dated, days.tolist(), levels.tolist()):
+            status_groups[level].append({
                 'id': item['id'],
                 'name': item['name'],
                 'category': item['category'],
                 'expiry_date': item['expiry_date'],
                 'days_remaining': days_until_expiry
-            }
-            
-            if days_until_expiry < 0:
-                # Already expired
-                status_groups['critical'].append(item_info)
-                self.db.update_item_status(item['id'], 'expired')
-                
-            elif days_until_expiry <= self.alert_thresholds['critical']:
-                status_groups['critical'].append(item_info)
-                
-            elif days_until_expiry <= self.alert_thresholds['warning']:
-                status_groups['warning'].append(item_info)
-                
-            elif days_until_expiry <= self.alert_thresholds['normal']:
-                status_groups['normal'].append(item_info)
-                
-            else:
-                status_groups['fresh'].append(item_info)
+            })
+        
+        self.db.bulk_update_status(expired_ids, 'expired')
         
         logger.info(f"Expiry check complete: {len(status_groups['critical'])} critical, "
                    f"{len(status_groups['warning'])} warning, {len(status_groups['normal'])} normal")
         
         return status_groups
     
-    def generate_alerts(self):
-        """Generate alerts for expiring items"""
+    def generate_alerts(self) -> int:
+        """Generate alerts for expiring items, returning the number of critical alerts"""
         status = self.check_expiry_status()
+        alert_rows = []
+        critical_messages = []
         
         # Critical alerts (expiring within 1 day or expired)
         for item in status['critical']:
@@ -85,51 +120,27 @@ class ExpiryTracker:
             else:
                 message = f"{item['name']} expires in {days} day(s)!"
             
-            self.db.create_alert(
-                food_item_id=item['id'],
-                alert_type='expiry',
-                alert_level='critical',
-                message=message
-            )
-            
-            if config.ENABLE_DESKTOP_NOTIFICATIONS:
-                self._send_desktop_notification('Critical Alert', message)
+            alert_rows.append((item['id'], 'expiry', 'critical', message))
+            critical_messages.append(message)
         
         # Warning alerts (expiring within 3 days)
         for item in status['warning']:
             message = f"{item['name']} expires in {item['days_remaining']} day(s)"
-            
-            self.db.create_alert(
-                food_item_id=item['id'],
-                alert_type='expiry',
-                alert_level='warning',
-                message=message
-            )
+            alert_rows.append((item['id'], 'expiry', 'warning', message))
         
         # Normal alerts (expiring within 7 days)
         for item in status['normal']:
             message = f"{item['name']} expires in {item['days_remaining']} day(s)"
-            
-            self.db.create_alert(
-                food_item_id=item['id'],
-                alert_type='expiry',
-                alert_level='normal',
-                message=message
-            )
+            alert_rows.append((item['id'], 'expiry', 'normal', message))
+        
+        self.db.bulk_create_alerts(alert_rows)
+        
+        # One combined notification instead of one per critical item
+        if config.ENABLE_DESKTOP_NOTIFICATIONS:
+            _send_critical_notification(critical_messages)
         
         logger.info("Alerts generated successfully")
-    
-    def _send_desktop_notification(self, title: str, message: str):
-        """Send desktop notification"""
-        try:
-            notification.notify(
-                title=title,
-                message=message,
-                app_name='Smart Fridge AI',
-                timeout=10
-            )
-        except Exception as e:
-            logger.warning(f"Desktop notification failed: {e}")
+        return len(critical_messages)
     
     def get_items_for_recipe(self, max_items: int = None) -> List[Dict]:
         """Get expiring items that can be used for recipe generation"""
@@ -137,27 +148,23 @@ class ExpiryTracker:
             max_items = config.MAX_INGREDIENTS_FOR_RECIPE
         
         # Get items expiring in next 3 days
-        expiring_items = self.db.get_expiring_items(days_threshold=3)
+        expiring_items = self.db.get_expiring_items_rows(days_threshold=3, limit=max_items)
         
-        if expiring_items.empty:
+        if not expiring_items:
             return []
         
-        items_list = []
-        for _, item in expiring_items.head(max_items).iterrows():
-            items_list.append({
-                'id': item['id'],
-                'name': item['name'],
-                'category': item['category'],
-                'quantity': item['quantity'],
-                'days_remaining': (pd.to_datetime(item['expiry_date']) - datetime.now()).days
-            })
+        days = _days_remaining([item['expiry_date'] for item in expiring_items], datetime.now())
         
-        return items_list
+        return [{
+            'id': item['id'],
+            'name': item['name'],
+            'category': item['category'],
+            'quantity': item['quantity'],
+            'days_remaining': days_until_expiry
+        } for item, days_until_expiry in zip(expiring_items, days.tolist())]
     
     def calculate_waste_statistics(self) -> Dict:
         """Calculate food waste statistics"""
-        conn = self.db.get_connection()
-        
         # Get expired items in last 30 days
         query = '''
             SELECT category, COUNT(*) as count, 
@@ -167,8 +174,8 @@ class ExpiryTracker:
             GROUP BY category
         '''
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        with self.db.get_connection() as conn:
+            df = pd.read_sql_query(query, conn)
         
         total_items = df['count'].sum()
         total_expired = df['expired_count'].sum()
@@ -185,8 +192,6 @@ class ExpiryTracker:
     
     def get_consumption_insights(self) -> Dict:
         """Get insights on consumption patterns"""
-        conn = self.db.get_connection()
-        
         # Most consumed categories
         query = '''
             SELECT category, COUNT(*) as consumption_count
@@ -197,8 +202,8 @@ class ExpiryTracker:
             LIMIT 5
         '''
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        with self.db.get_connection() as conn:
+            df = pd.read_sql_query(query, conn)
         
         insights = {
             'top_consumed_categories': df.to_dict('records'),
@@ -270,17 +275,18 @@ class AlertManager:
         if alerts.empty:
             return "<p>No active alerts</p>"
         
-        html = "<h3>Active Alerts</h3><ul>"
-        
-        for _, alert in alerts.iterrows():
-            color = {
-                'critical': 'red',
-                'warning': 'orange',
-                'normal': 'blue'
-            }.get(alert['alert_level'], 'gray')
-            
-            html += f"<li style='color: {color}'><strong>{alert['food_name']}</strong>: {alert['message']}</li>"
+        colors = {
+            'critical': 'red',
+            'warning': 'orange',
+            'normal': 'blue'
+        }
         
-        html += "</ul>"
+        parts = ["<h3>Active Alerts</h3><ul>"]
+        for level, food_name, message in zip(alerts['alert_level'].tolist(),
+                                             alerts['food_name'].tolist(),
+                                             alerts['message'].tolist()):
+            color = colors.get(level, 'gray')
+            parts.append(f"<li style='color: {color}'><strong>{food_name}</strong>: {message}</li>")
+        parts.append("</ul>")
         
-        return html
+        return "".join(parts)
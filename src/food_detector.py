@@ -4,41 +4,118 @@ Food Detection and Recognition using Computer Vision
 import cv2
 import numpy as np
 from PIL import Image
-import easyocr
 import pytesseract
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import cached_property, lru_cache
 import re
 from typing import List, Dict, Tuple, Optional
 from loguru import logger
-from ultralytics import YOLO
-import config
+from . import config
+
+
+@lru_cache(maxsize=64)
+def _default_expiry(category: str, today: date) -> datetime:
+    """Default expiry for an item stored today, cached per (category, day)"""
+    shelf_life_days = config.DEFAULT_SHELF_LIFE.get(category, 7)
+    return datetime.combine(today, datetime.min.time()) + timedelta(days=shelf_life_days)
 
 
 class FoodDetector:
     """Handles food detection, recognition, and expiry date extraction"""
     
+    # Common date formats, optionally preceded by an expiry label, matched in one pass
+    _EXPIRY_RE = re.compile(
+        r'(?P<label>(?:exp|expiry|best before|use by)[\s:]*)?'
+        r'(?P<date>\d{4}[-/]\d{1,2}[-/]\d{1,2}'
+        r'|\d{1,2}[-/]\d{1,2}[-/]\d{2,4}'
+        r'|\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{2,4})',
+        re.IGNORECASE
+    )
+    
+    _DATE_FORMATS = (
+        '%d/%m/%Y',
+        '%m/%d/%Y',
+        '%Y/%m/%d',
+        '%d-%m-%Y',
+        '%m-%d-%Y',
+        '%Y-%m-%d',
+        '%d %b %Y',
+        '%d %B %Y',
+    )
+    
+    # Keyword lists in the order categories are checked
+    _CATEGORY_KEYWORDS = {
+        'Vegetables': ('carrot', 'broccoli', 'lettuce', 'tomato', 'cucumber', 'spinach', 'potato'),
+        'Fruits': ('apple', 'banana', 'orange', 'strawberry', 'grape', 'mango', 'watermelon'),
+        'Dairy': ('milk', 'cheese', 'yogurt', 'butter', 'cream'),
+        'Meat': ('chicken', 'beef', 'pork', 'lamb', 'turkey'),
+        'Seafood': ('fish', 'salmon', 'tuna', 'shrimp', 'crab'),
+    }
+    # One substring pattern per category, checked in order like the previous `keyword in name` loops
+    _CATEGORY_PATTERNS = tuple(
+        (category, re.compile('|'.join(map(re.escape, keywords))))
+        for category, keywords in _CATEGORY_KEYWORDS.items()
+    )
+    
     def __init__(self):
-        self.reader = easyocr.Reader(['en'])
         self.confidence_threshold = config.CONFIDENCE_THRESHOLD
+        self._cap = None
+        self._cap_id = None
+    
+    @cached_property
+    def reader(self):
+        """EasyOCR reader, created on first use"""
+        import easyocr
         
+        return easyocr.Reader(['en'])
+    
+    @cached_property
+    def model(self):
+        """YOLO model, loaded on first use (None if unavailable)"""
         # Initialize YOLO model (you'll need to train or use a pretrained food detection model)
         try:
-            self.model = YOLO(config.FOOD_DETECTION_MODEL)
+            from ultralytics import YOLO
+            
+            model = YOLO(config.FOOD_DETECTION_MODEL)
             logger.info("YOLO model loaded successfully")
         except Exception as e:
             logger.warning(f"Could not load YOLO model: {e}. Using fallback detection.")
-            self.model = None
+            return None
+        
+        # Fold batch-norm into conv layers once instead of per inference
+        try:
+            model.fuse()
+        except Exception as e:
+            logger.warning(f"Could not fuse YOLO model layers: {e}")
+        return model
+    
+    @cached_property
+    def _half_precision(self) -> bool:
+        """Run inference in FP16 when a CUDA device is available"""
+        try:
+            import torch
+            
+            return torch.cuda.is_available()
+        except ImportError:
+            return False
     
     def capture_image(self, camera_id: int = config.CAMERA_ID) -> np.ndarray:
-        """Capture image from camera"""
-        cap = cv2.VideoCapture(camera_id)
+        """Capture image from camera, keeping it open between captures"""
+        if self._cap is None or self._cap_id != camera_id or not self._cap.isOpened():
+            self.close()
+            self._cap = cv2.VideoCapture(camera_id)
+            self._cap_id = camera_id
+            # Only buffer a single frame, flushed before each read
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
-        if not cap.isOpened():
+        if not self._cap.isOpened():
             logger.error("Cannot open camera")
+            self.close()
             return None
         
-        ret, frame = cap.read()
-        cap.release()
+        # Drop the frame buffered since the last capture, which may be hours old
+        self._cap.grab()
+        ret, frame = self._cap.read()
         
         if not ret:
             logger.error("Cannot capture frame")
@@ -47,39 +124,62 @@ class FoodDetector:
         logger.info("Image captured successfully")
         return frame
     
+    def close(self):
+        """Release the camera if it is open"""
+        cap = getattr(self, '_cap', None)
+        if cap is not None:
+            cap.release()
+            self._cap = None
+            self._cap_id = None
+    
+    def __del__(self):
+        self.close()
+    
     def detect_food_items(self, image: np.ndarray) -> List[Dict]:
         """Detect food items in the image using YOLO"""
+        return self.detect_food_items_batch([image])[0]
+    
+    def detect_food_items_batch(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """Detect food items in several images with one batched YOLO call"""
         if self.model is None:
             logger.warning("No model available, using mock detection")
-            return self._mock_detection(image)
+            return [self._mock_detection(image) for image in images]
         
         try:
-            results = self.model(image)
-            detected_items = []
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    confidence = float(box.conf[0])
-                    
-                    if confidence >= self.confidence_threshold:
-                        class_id = int(box.cls[0])
-                        class_name = result.names[class_id]
-                        bbox = box.xyxy[0].tolist()
-                        
-                        detected_items.append({
-                            'name': class_name,
-                            'confidence': confidence,
-                            'bbox': bbox,
-                            'category': self._categorize_food(class_name)
-                        })
+            results = self.model(images, imgsz=config.IMAGE_SIZE,
+                                 half=self._half_precision, verbose=False)
+            detections = [self._parse_detections(result) for result in results]
             
-            logger.info(f"Detected {len(detected_items)} food items")
-            return detected_items
+            logger.info(f"Detected {sum(map(len, detections))} food items "
+                        f"in {len(images)} image(s)")
+            return detections
             
         except Exception as e:
             logger.error(f"Error in food detection: {e}")
-            return []
+            return [[] for _ in images]
+    
+    def _parse_detections(self, result) -> List[Dict]:
+        """Convert one YOLO result into detected item dicts"""
+        detected_items = []
+        threshold = self.confidence_threshold
+        names = result.names
+        categorize = self._categorize_food
+        
+        for box in result.boxes:
+            confidence = float(box.conf[0])
+            
+            if confidence >= threshold:
+                class_name = names[int(box.cls[0])]
+                bbox = box.xyxy[0].tolist()
+                
+                detected_items.append({
+                    'name': class_name,
+                    'confidence': confidence,
+                    'bbox': bbox,
+                    'category': categorize(class_name)
+                })
+        
+        return detected_items
     
     def _mock_detection(self, image: np.ndarray) -> List[Dict]:
         """Mock detection for demo purposes"""
@@ -93,32 +193,9 @@ class FoodDetector:
     def _categorize_food(self, food_name: str) -> str:
         """Categorize food item"""
         food_name_lower = food_name.lower()
-        
-        vegetables = ['carrot', 'broccoli', 'lettuce', 'tomato', 'cucumber', 'spinach', 'potato']
-        fruits = ['apple', 'banana', 'orange', 'strawberry', 'grape', 'mango', 'watermelon']
-        dairy = ['milk', 'cheese', 'yogurt', 'butter', 'cream']
-        meat = ['chicken', 'beef', 'pork', 'lamb', 'turkey']
-        seafood = ['fish', 'salmon', 'tuna', 'shrimp', 'crab']
-        
-        for veg in vegetables:
-            if veg in food_name_lower:
-                return 'Vegetables'
-        
-        for fruit in fruits:
-            if fruit in food_name_lower:
-                return 'Fruits'
-        
-        for d in dairy:
-            if d in food_name_lower:
-                return 'Dairy'
-        
-        for m in meat:
-            if m in food_name_lower:
-                return 'Meat'
-        
-        for s in seafood:
-            if s in food_name_lower:
-                return 'Seafood'
+        for category, pattern in self._CATEGORY_PATTERNS:
+            if pattern.search(food_name_lower):
+                return category
         
         return 'Others'
     
@@ -142,43 +219,75 @@ class FoodDetector:
             logger.error(f"Error in OCR: {e}")
             return ""
     
-    def extract_expiry_date(self, text: str) -> Optional[datetime]:
-        """Extract expiry date from OCR text"""
-        # Common date patterns
-        patterns = [
-            r'(?:exp|expiry|best before|use by)[\s:]*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-            r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})',
-            r'(\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{2,4})',
-        ]
+    def extract_text_for_boxes(self, image: np.ndarray, bboxes: List[List[float]]) -> List[str]:
+        """Extract text for several boxes with one OCR pass over the whole image"""
+        if not bboxes:
+            return []
         
-        text_lower = text.lower()
+        # Text regions are assigned to the boxes containing their center
+        regions = self.read_text_regions(image, bboxes)
+        return [' '.join(self._regions_within(regions, bbox)) for bbox in bboxes]
+    
+    def read_text_regions(self, image: np.ndarray,
+                          bboxes: List[List[float]]) -> List[Tuple[float, float, str]]:
+        """OCR the text lines centered inside bboxes, returning (center_x, center_y, text) per line"""
+        try:
+            # Find text lines once on the colour frame (what readtext does first)
+            horizontal_list, free_list = self.reader.detect(image, reformat=False)
+            horizontal_list = [box for box in horizontal_list[0]
+                               if self._inside_any((box[0] + box[1]) / 2, (box[2] + box[3]) / 2, bboxes)]
+            free_list = [box for box in free_list[0]
+                         if self._inside_any(*np.mean(box, axis=0), bboxes)]
+            if not horizontal_list and not free_list:
+                return []
+            
+            # Recognize only lines on an item; the recognizer takes single-channel line crops
+            # and resizes each to its 64 px input height itself
+            grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+            result = self.reader.recognize(grey, horizontal_list, free_list, reformat=False)
+        except Exception as e:
+            logger.error(f"Error in OCR: {e}")
+            return []
         
-        for pattern in patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            if matches:
-                date_str = matches[0]
-                parsed_date = self._parse_date(date_str)
-                if parsed_date:
-                    logger.info(f"Extracted expiry date: {parsed_date}")
-                    return parsed_date
+        regions = []
+        for box, text, _ in result:
+            xs, ys = zip(*box)
+            regions.append((sum(xs) / len(xs), sum(ys) / len(ys), text))
+        return regions
+    
+    @staticmethod
+    def _inside_any(x: float, y: float, bboxes: List[List[float]]) -> bool:
+        """Whether the point lies inside any of the bboxes"""
+        return any(x1 <= x <= x2 and y1 <= y <= y2 for x1, y1, x2, y2 in bboxes)
+    
+    @staticmethod
+    def _regions_within(regions: List[Tuple[float, float, str]], bbox: List[float]) -> List[str]:
+        """Values of the (center_x, center_y, value) regions whose center lies inside bbox"""
+        x1, y1, x2, y2 = bbox
+        return [value for cx, cy, value in regions
+                if x1 <= cx <= x2 and y1 <= cy <= y2]
+    
+    def extract_expiry_date(self, text: str) -> Optional[datetime]:
+        """Extract expiry date from OCR text"""
+        # A labelled date wins; otherwise fall back to the first date that parses
+        fallback = None
+        for match in self._EXPIRY_RE.finditer(text.lower()):
+            parsed_date = self._parse_date(match.group('date'))
+            if parsed_date is None:
+                continue
+            if match.group('label'):
+                fallback = parsed_date
+                break
+            if fallback is None:
+                fallback = parsed_date
         
-        return None
+        if fallback:
+            logger.info(f"Extracted expiry date: {fallback}")
+        return fallback
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object"""
-        formats = [
-            '%d/%m/%Y',
-            '%m/%d/%Y',
-            '%Y/%m/%d',
-            '%d-%m-%Y',
-            '%m-%d-%Y',
-            '%Y-%m-%d',
-            '%d %b %Y',
-            '%d %B %Y',
-        ]
-        
-        for fmt in formats:
+        for fmt in self._DATE_FORMATS:
             try:
                 return datetime.strptime(date_str, fmt)
             except ValueError:
@@ -189,30 +298,37 @@ class FoodDetector:
     def estimate_expiry_date(self, category: str, storage_date: datetime = None) -> datetime:
         """Estimate expiry date based on category default shelf life"""
         if storage_date is None:
-            storage_date = datetime.now()
-        
-        shelf_life_days = config.DEFAULT_SHELF_LIFE.get(category, 7)
-        expiry_date = storage_date + timedelta(days=shelf_life_days)
+            expiry_date = _default_expiry(category, date.today())
+        else:
+            shelf_life_days = config.DEFAULT_SHELF_LIFE.get(category, 7)
+            expiry_date = storage_date + timedelta(days=shelf_life_days)
         
-        logger.info(f"Estimated expiry date for {category}: {expiry_date}")
+        # Lazy formatting: the message is only built if debug logging is enabled
+        logger.debug("Estimated expiry date for {}: {}", category, expiry_date)
         return expiry_date
     
     def scan_barcode(self, image: np.ndarray) -> Optional[str]:
         """Scan barcode from image"""
+        barcodes = self.decode_barcodes(image)
+        return barcodes[0][2] if barcodes else None
+    
+    def decode_barcodes(self, image: np.ndarray) -> List[Tuple[float, float, str]]:
+        """Decode all barcodes in the image, returning (center_x, center_y, data) per barcode"""
         try:
             from pyzbar import pyzbar
             
-            barcodes = pyzbar.decode(image)
-            
-            if barcodes:
-                barcode_data = barcodes[0].data.decode('utf-8')
+            barcodes = []
+            for barcode in pyzbar.decode(image):
+                rect = barcode.rect
+                barcode_data = barcode.data.decode('utf-8')
                 logger.info(f"Barcode detected: {barcode_data}")
-                return barcode_data
+                barcodes.append((rect.left + rect.width / 2, rect.top + rect.height / 2, barcode_data))
+            return barcodes
             
         except Exception as e:
             logger.warning(f"Barcode scanning failed: {e}")
         
-        return None
+        return []
     
     def process_fridge_scan(self, image_path: str = None) -> List[Dict]:
         """Complete scan process for fridge contents"""
@@ -222,19 +338,36 @@ class FoodDetector:
         else:
             image = self.capture_image()
         
+        return self.process_image(image)
+    
+    def process_image(self, image: Optional[np.ndarray]) -> List[Dict]:
+        """Scan an already decoded BGR image, never falling back to the camera"""
         if image is None:
             logger.error("No image available for scanning")
             return []
         
         # Detect food items
         detected_items = self.detect_food_items(image)
+        return self._process_detections(image, detected_items)
+    
+    def process_images(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """Scan several decoded BGR images (e.g. one per shelf) with a single batched detection pass"""
+        if not images:
+            return []
+        
+        detections = self.detect_food_items_batch(images)
+        return [self._process_detections(image, detected_items)
+                for image, detected_items in zip(images, detections)]
+    
+    def _process_detections(self, image: np.ndarray, detected_items: List[Dict]) -> List[Dict]:
+        """Attach expiry dates and barcodes to the items detected in one image"""
+        # OCR and decode barcodes over the whole frame once, then share them between items
+        texts = self.extract_text_for_boxes(image, [item['bbox'] for item in detected_items])
+        barcode_regions = self.decode_barcodes(image) if detected_items else []
         
         # Process each detected item
         processed_items = []
-        for item in detected_items:
-            # Extract text from bounding box
-            text = self.extract_text_from_image(image, item['bbox'])
-            
+        for item, text in zip(detected_items, texts):
             # Try to extract expiry date
             expiry_date = self.extract_expiry_date(text)
             
@@ -242,8 +375,9 @@ class FoodDetector:
             if expiry_date is None:
                 expiry_date = self.estimate_expiry_date(item['category'])
             
-            # Try to scan barcode
-            barcode = self.scan_barcode(image)
+            # Barcode printed on this item, if any
+            barcodes = self._regions_within(barcode_regions, item['bbox'])
+            barcode = barcodes[0] if barcodes else None
             
             processed_item = {
                 'name': item['name'],
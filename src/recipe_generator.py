@@ -3,9 +3,30 @@ AI-Powered Recipe Generator
 Generates recipes using expiring ingredients
 """
 from typing import List, Dict, Optional
+import asyncio
 import json
+import os
+import re
+from datetime import datetime
+from functools import cached_property
 from loguru import logger
-import config
+from . import config
+
+
+# Substrings that mark an ingredient as a vegetable or a protein
+_VEG_SET = frozenset({'vegetable', 'carrot', 'broccoli', 'lettuce', 'tomato', 'cucumber'})
+_PROTEIN_SET = frozenset({'chicken', 'beef', 'pork', 'fish', 'tofu', 'eggs'})
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Amount and unit given to every ingredient in a fallback recipe
+_INGREDIENT_DEFAULTS = {'amount': '1', 'unit': 'portion'}
+
+# One alternation over every keyword; the named group that matched gives its tag
+_INGREDIENT_TAG_RE = re.compile(
+    f"(?P<veg>{'|'.join(map(re.escape, sorted(_VEG_SET)))})"
+    f"|(?P<protein>{'|'.join(map(re.escape, sorted(_PROTEIN_SET)))})"
+)
 
 
 class RecipeGenerator:
@@ -14,11 +35,16 @@ class RecipeGenerator:
     def __init__(self):
         self.api_key = config.RECIPE_API_KEY
     
-    def generate_recipe(self, ingredients: List[str], 
-                       cuisine_type: str = None,
-                       dietary_restrictions: List[str] = None) -> Dict:
-        """Generate a recipe using AI based on available ingredients"""
-        
+    @cached_property
+    def _recipes_dir(self) -> str:
+        """Directory for saved recipes, created once on first use"""
+        save_dir = os.path.join(config.BASE_DIR, 'data', 'recipes')
+        os.makedirs(save_dir, exist_ok=True)
+        return save_dir
+    
+    def _build_prompt(self, ingredients: List[str], cuisine_type: str = None,
+                      dietary_restrictions: List[str] = None) -> str:
+        """Build the recipe request prompt for the language model"""
         # Format ingredients list
         ingredients_text = ", ".join(ingredients)
         
@@ -58,59 +84,98 @@ Requirements:
     "tips": ["Optional cooking tips"]
 }"""
         
+        return prompt
+    
+    def generate_recipe(self, ingredients: List[str], 
+                       cuisine_type: str = None,
+                       dietary_restrictions: List[str] = None) -> Dict:
+        """Generate a recipe using AI based on available ingredients"""
+        # Fallback to rule-based recipe generation without an API key
+        if not self.api_key:
+            return self._generate_fallback_recipe(ingredients)
+        
         try:
-            # Try using OpenAI API if available
-            if self.api_key:
-                recipe = self._generate_with_openai(prompt)
-            else:
-                # Fallback to rule-based recipe generation
-                recipe = self._generate_fallback_recipe(ingredients)
-            
-            logger.info(f"Generated recipe: {recipe.get('name', 'Unknown')}")
-            return recipe
-            
+            response = self._client.chat.completions.create(
+                **self._completion_request(ingredients, cuisine_type, dietary_restrictions))
         except Exception as e:
-            logger.error(f"Recipe generation failed: {e}")
-            return self._generate_fallback_recipe(ingredients)
+            return self._recipe_failed(e, ingredients)
+        return self._recipe_from_response(response, ingredients)
     
-    def _generate_with_openai(self, prompt: str) -> Dict:
-        """Generate recipe using OpenAI API"""
+    async def generate_recipes_async(self, ingredient_groups: List[List[str]],
+                                     cuisine_type: str = None,
+                                     dietary_restrictions: List[str] = None) -> List[Dict]:
+        """Generate one recipe per ingredient group, with the API calls in flight concurrently"""
+        if not self.api_key:
+            return [self._generate_fallback_recipe(ingredients) for ingredients in ingredient_groups]
+        
         try:
-            import openai
-            
-            openai.api_key = self.api_key
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional chef and recipe creator. Generate creative and practical recipes."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            recipe_text = response.choices[0].message.content
-            
-            # Parse JSON from response
-            recipe_json = self._extract_json_from_text(recipe_text)
-            
-            return recipe_json
-            
+            from openai import AsyncOpenAI
+        except ImportError as e:
+            return [self._recipe_failed(e, ingredients) for ingredients in ingredient_groups]
+        
+        # One client per batch shares its connection pool between the calls
+        # and is closed on the event loop that opened it
+        async with AsyncOpenAI(api_key=self.api_key) as client:
+            return await asyncio.gather(*(
+                self._generate_with_client_async(client, ingredients, cuisine_type, dietary_restrictions)
+                for ingredients in ingredient_groups
+            ))
+    
+    async def _generate_with_client_async(self, client, ingredients: List[str],
+                                          cuisine_type: str = None,
+                                          dietary_restrictions: List[str] = None) -> Dict:
+        """Generate a recipe on a shared async OpenAI client"""
+        try:
+            response = await client.chat.completions.create(
+                **self._completion_request(ingredients, cuisine_type, dietary_restrictions))
         except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise
+            return self._recipe_failed(e, ingredients)
+        return self._recipe_from_response(response, ingredients)
+    
+    @cached_property
+    def _client(self):
+        """Shared OpenAI client, reusing its HTTP connection pool across calls"""
+        from openai import OpenAI
+        
+        return OpenAI(api_key=self.api_key)
+    
+    def _completion_request(self, ingredients: List[str], cuisine_type: str = None,
+                            dietary_restrictions: List[str] = None) -> Dict:
+        """Chat completion arguments for a recipe request"""
+        return {
+            'model': "gpt-3.5-turbo",
+            'messages': [
+                {"role": "system", "content": "You are a professional chef and recipe creator. Generate creative and practical recipes."},
+                {"role": "user", "content": self._build_prompt(ingredients, cuisine_type, dietary_restrictions)}
+            ],
+            'temperature': 0.7,
+            'max_tokens': 1000
+        }
+    
+    def _recipe_from_response(self, response, ingredients: List[str]) -> Dict:
+        """Parse the recipe out of a chat completion, falling back if it holds none"""
+        try:
+            recipe = self._extract_json_from_text(response.choices[0].message.content)
+        except Exception as e:
+            return self._recipe_failed(e, ingredients)
+        
+        logger.info(f"Generated recipe: {recipe.get('name', 'Unknown')}")
+        return recipe
+    
+    def _recipe_failed(self, error: Exception, ingredients: List[str]) -> Dict:
+        """Log a failed generation and return the fallback recipe instead"""
+        logger.error(f"Recipe generation failed: {error}")
+        return self._generate_fallback_recipe(ingredients)
     
     def _extract_json_from_text(self, text: str) -> Dict:
         """Extract JSON from text response"""
         try:
-            # Try to find JSON in the text
+            # Decode the first JSON object in place, ignoring any prose after it
             start_idx = text.find('{')
-            end_idx = text.rfind('}') + 1
             
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = text[start_idx:end_idx]
-                return json.loads(json_str)
+            if start_idx != -1:
+                recipe, _ = _JSON_DECODER.raw_decode(text, start_idx)
+                return recipe
             else:
                 raise ValueError("No JSON found in response")
                 
@@ -176,15 +241,11 @@ Requirements:
         # Select template based on ingredients
         selected_template = recipe_templates[0]  # Default to stir fry
         
-        # Categorize ingredients
-        has_vegetables = any('vegetable' in str(ing).lower() or 
-                           any(veg in str(ing).lower() for veg in 
-                           ['carrot', 'broccoli', 'lettuce', 'tomato', 'cucumber'])
-                           for ing in ingredients)
-        
-        has_protein = any(prot in str(ing).lower() for prot in 
-                         ['chicken', 'beef', 'pork', 'fish', 'tofu', 'eggs']
-                         for ing in ingredients)
+        # Categorize ingredients in a single regex pass over all of them
+        lowered = '\n'.join(str(ing).lower() for ing in ingredients)
+        tags = {match.lastgroup for match in _INGREDIENT_TAG_RE.finditer(lowered)}
+        has_vegetables = 'veg' in tags
+        has_protein = 'protein' in tags
         
         if not has_protein and has_vegetables:
             selected_template = recipe_templates[1]  # Salad
@@ -192,13 +253,7 @@ Requirements:
             selected_template = recipe_templates[2]  # One-pot
         
         # Build ingredient list
-        ingredient_list = []
-        for ing in ingredients:
-            ingredient_list.append({
-                'item': ing,
-                'amount': '1',
-                'unit': 'portion'
-            })
+        ingredient_list = [{'item': ing, **_INGREDIENT_DEFAULTS} for ing in ingredients]
         
         recipe = selected_template.copy()
         recipe['ingredients'] = ingredient_list
@@ -206,19 +261,17 @@ Requirements:
         
         return recipe
     
-    def save_recipe_to_file(self, recipe: Dict, filename: str = None) -> str:
-        """Save recipe to a file"""
-        import os
-        from datetime import datetime
-        
+    def _recipe_filepath(self, filename: Optional[str]) -> str:
+        """Path to save a recipe under, timestamped if no filename is given"""
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"recipe_{timestamp}.json"
         
-        save_dir = os.path.join(config.BASE_DIR, 'data', 'recipes')
-        os.makedirs(save_dir, exist_ok=True)
-        
-        filepath = os.path.join(save_dir, filename)
+        return os.path.join(self._recipes_dir, filename)
+    
+    def save_recipe_to_file(self, recipe: Dict, filename: str = None) -> str:
+        """Save recipe to a file"""
+        filepath = self._recipe_filepath(filename)
         
         with open(filepath, 'w') as f:
             json.dump(recipe, f, indent=2)
@@ -228,46 +281,45 @@ Requirements:
     
     def format_recipe_for_display(self, recipe: Dict) -> str:
         """Format recipe as readable text"""
-        output = f"🍽️ {recipe['name']}\n"
-        output += "=" * 50 + "\n\n"
+        parts = []
+        append = parts.append
+        
+        append(f"🍽️ {recipe['name']}\n")
+        append("=" * 50 + "\n\n")
         
-        output += f"📝 Description: {recipe.get('description', 'N/A')}\n"
-        output += f"🌍 Cuisine: {recipe.get('cuisine_type', 'N/A')}\n"
-        output += f"⏱️ Prep Time: {recipe.get('prep_time', 'N/A')} mins\n"
-        output += f"🔥 Cook Time: {recipe.get('cook_time', 'N/A')} mins\n"
-        output += f"👥 Servings: {recipe.get('servings', 'N/A')}\n\n"
+        append(f"📝 Description: {recipe.get('description', 'N/A')}\n")
+        append(f"🌍 Cuisine: {recipe.get('cuisine_type', 'N/A')}\n")
+        append(f"⏱️ Prep Time: {recipe.get('prep_time', 'N/A')} mins\n")
+        append(f"🔥 Cook Time: {recipe.get('cook_time', 'N/A')} mins\n")
+        append(f"👥 Servings: {recipe.get('servings', 'N/A')}\n\n")
         
-        output += "📦 INGREDIENTS:\n"
-        output += "-" * 50 + "\n"
+        append("📦 INGREDIENTS:\n")
+        append("-" * 50 + "\n")
         for ing in recipe.get('ingredients', []):
             if isinstance(ing, dict):
-                output += f"• {ing.get('amount', '')} {ing.get('unit', '')} {ing.get('item', '')}\n"
+                append(f"• {ing.get('amount', '')} {ing.get('unit', '')} {ing.get('item', '')}\n")
             else:
-                output += f"• {ing}\n"
+                append(f"• {ing}\n")
         
-        output += "\n📋 INSTRUCTIONS:\n"
-        output += "-" * 50 + "\n"
+        append("\n📋 INSTRUCTIONS:\n")
+        append("-" * 50 + "\n")
         for i, step in enumerate(recipe.get('instructions', []), 1):
-            output += f"{i}. {step}\n"
+            append(f"{i}. {step}\n")
         
         if recipe.get('tips'):
-            output += "\n💡 TIPS:\n"
-            output += "-" * 50 + "\n"
+            append("\n💡 TIPS:\n")
+            append("-" * 50 + "\n")
             for tip in recipe['tips']:
-                output += f"• {tip}\n"
+                append(f"• {tip}\n")
         
-        return output
+        return "".join(parts)
     
     def generate_shopping_list(self, recipe: Dict, available_ingredients: List[str]) -> List[str]:
         """Generate shopping list for missing ingredients"""
         required_ingredients = [ing['item'] if isinstance(ing, dict) else ing 
                               for ing in recipe.get('ingredients', [])]
         
-        available_lower = [ing.lower() for ing in available_ingredients]
-        
-        shopping_list = []
-        for ingredient in required_ingredients:
-            if ingredient.lower() not in available_lower:
-                shopping_list.append(ingredient)
+        available_lower = frozenset(ing.lower() for ing in available_ingredients)
         
-        return shopping_list
+        return [ingredient for ingredient in required_ingredients
+                if ingredient.lower() not in available_lower]